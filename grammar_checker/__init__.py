@@ -1,9 +1,28 @@
-from .core import GrammarChecker
-from .context import ContextAnalyzer
-from .knowledge import LinguisticKnowledge
-
-__all__ = [
-    "GrammarChecker",
-    "ContextAnalyzer",
-    "LinguisticKnowledge"
-]
\ No newline at end of file
+"""English grammar checker built on spaCy.
+
+Public names are imported on first access, so ``import grammar_checker``
+does not load spaCy, lemminflect or the detectors until they are used.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "GrammarChecker": "grammar_checker.core",
+    "ContextAnalyzer": "grammar_checker.context",
+    "LinguisticKnowledge": "grammar_checker.knowledge",
+    "get_knowledge": "grammar_checker.knowledge",
+    "get_nlp": "grammar_checker.models",
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
\ No newline at end of file
@@ -0,0 +1,108 @@
+from grammar_checker.knowledge import get_knowledge
+from grammar_checker.token_index import token_index
+
+AGREEMENT_KEY = "agreement"
+
+SUBJECT_DEPS = ("nsubj", "nsubjpass")
+
+THIRD_SINGULAR_PRONOUNS = frozenset({'he', 'she', 'it'})
+NON_THIRD_SINGULAR_PRONOUNS = frozenset({'i', 'you', 'we', 'they'})
+PLURAL_DEMONSTRATIVES = frozenset({'these', 'those'})
+
+# Words ending in -s that are not plurals.
+_SINGULAR_S_ENDINGS = ('ss', 'us', 'is', 'as', 'os')
+
+class AgreementAnalysis:
+    """Subjects of every verb in a Doc and the person/number of each subject.
+
+    Shared by the subject-verb, helping-verb and tense detectors so they
+    resolve subjects the same way and do the work once per Doc.
+    """
+
+    __slots__ = ("doc", "knowledge", "_subjects", "_third_singular")
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.knowledge = get_knowledge()
+        self._subjects = {
+            verb.i: self._resolve_subject(verb)
+            for verb in token_index(doc).pos("VERB", "AUX")
+        }
+        self._third_singular = {}
+
+    def subject(self, verb):
+        """Subject of ``verb``: its own nsubj, else its head's."""
+        if verb.i in self._subjects:
+            return self._subjects[verb.i]
+        return self._resolve_subject(verb)
+
+    def is_third_person_singular(self, subject):
+        """Whether ``subject`` takes third person singular verb forms."""
+        if subject.i not in self._third_singular:
+            self._third_singular[subject.i] = self._classify(subject)
+        return self._third_singular[subject.i]
+
+    def is_plural(self, noun):
+        """Spelling-based plural check for nouns."""
+        text = noun.lower_
+        if text in self.knowledge.ACADEMIC_SUBJECTS:
+            return False
+        if text in self.knowledge.IRREGULAR_PLURALS:
+            return True
+        return text.endswith('s') and not text.endswith(_SINGULAR_S_ENDINGS)
+
+    def _resolve_subject(self, verb):
+        for child in verb.children:
+            if child.dep_ in SUBJECT_DEPS:
+                return child
+
+        if verb.head != verb:
+            for child in verb.head.children:
+                if child.dep_ in SUBJECT_DEPS:
+                    return child
+
+        return None
+
+    def _classify(self, subject):
+        text = subject.lower_
+        knowledge = self.knowledge
+
+        if text in THIRD_SINGULAR_PRONOUNS:
+            return True
+        if text in NON_THIRD_SINGULAR_PRONOUNS:
+            return False
+        if text in knowledge.INDEFINITE_PLURAL or text in PLURAL_DEMONSTRATIVES:
+            return False
+
+        # Coordinated subjects ("John and Mary") are plural
+        if any(child.dep_ == 'conj' for child in subject.children) and \
+                any(child.lower_ == 'and' for child in subject.children):
+            return False
+
+        if (text in knowledge.INDEFINITE_SINGULAR or
+                text in knowledge.COLLECTIVE_NOUNS or
+                text in knowledge.ACADEMIC_SUBJECTS):
+            return True
+
+        # "each of", "every one of" patterns are singular
+        if subject.i > 0 and subject.doc[subject.i - 1].lower_ in ('each', 'every'):
+            return True
+
+        person = subject.morph.get("Person")
+        number = subject.morph.get("Number")
+        if person and number:
+            return person[0] == "3" and number[0] == "Sing"
+
+        if subject.pos_ in ("NOUN", "PROPN"):
+            return not self.is_plural(subject)
+
+        # Default to singular for unknown cases ("this", "that", "what")
+        return True
+
+def agreement(doc):
+    """Per-Doc agreement analysis, built once and kept in doc.user_data."""
+    analysis = doc.user_data.get(AGREEMENT_KEY)
+    if analysis is None:
+        analysis = AgreementAnalysis(doc)
+        doc.user_data[AGREEMENT_KEY] = analysis
+    return analysis
@@ -0,0 +1,190 @@
+from collections import OrderedDict, namedtuple
+import hashlib
+import pickle
+import re
+import threading
+import time
+import unicodedata
+from grammar_checker.knowledge import knowledge_fingerprint
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_DISK_ENTRIES = 1000000
+# Disk writes are committed (and the disk tier pruned) every this many puts.
+DEFAULT_COMMIT_EVERY = 256
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+def normalize_text(text):
+    """Canonical form of a sentence for caching: NFC, single spaces, stripped."""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+class ResultCache:
+    """Content-addressed cache of GrammarChecker results.
+
+    Keys are a SHA-256 of the normalized sentence, the detectors that ran,
+    the knowledge base fingerprint and ``namespace`` (bump it when detector
+    rules change). Results are stored pickled, so every hit returns a fresh
+    copy. The in-memory tier is an LRU bounded by ``max_entries`` and
+    ``max_bytes``; entries older than ``ttl`` seconds are treated as
+    missing. With ``path`` set, results are also written to a sqlite file
+    that survives restarts and is consulted on memory misses. Disk writes
+    are committed every ``commit_every`` puts and on ``flush()``/``close()``;
+    each commit also drops expired rows and the oldest written rows beyond
+    ``max_disk_entries``.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES, ttl=None,
+                 path=None, namespace="", max_disk_entries=DEFAULT_MAX_DISK_ENTRIES,
+                 commit_every=DEFAULT_COMMIT_EVERY):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.path = path
+        self.namespace = namespace
+        self.max_disk_entries = max_disk_entries
+        self.commit_every = commit_every
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "disk_hits": 0, "evictions": 0, "expirations": 0}
+
+        self._db = None
+        self._uncommitted = 0
+        if path is not None:
+            import sqlite3
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB, expires REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_expires ON results (expires)")
+            self._commit()
+
+    def key(self, text, detectors):
+        """Cache key for a normalized sentence checked by ``detectors``."""
+        parts = [self.namespace, knowledge_fingerprint(), ",".join(detectors), text]
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return a copy of the cached result, or None."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, blob = entry
+                if expires is None or expires > now:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return pickle.loads(blob)
+                self._remove(key)
+                self._stats["expirations"] += 1
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    blob, expires = row
+                    if expires is None or expires > now:
+                        self._store(key, blob, expires)
+                        self._stats["hits"] += 1
+                        self._stats["disk_hits"] += 1
+                        return pickle.loads(blob)
+                    self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                    self._written()
+                    self._stats["expirations"] += 1
+
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key, result):
+        blob = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        expires = time.time() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._store(key, blob, expires)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, value, expires) VALUES (?, ?, ?)",
+                    (key, blob, expires),
+                )
+                self._written()
+
+    def flush(self):
+        """Commit pending disk writes."""
+        with self._lock:
+            if self._db is not None:
+                self._commit()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._commit()
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._commit()
+                self._db.close()
+                self._db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def stats(self):
+        """Hit/miss/eviction counters plus current size."""
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._bytes)
+
+    def cache_info(self):
+        """lru_cache-style summary, for Instrumentation.register_cache."""
+        with self._lock:
+            return CacheInfo(self._stats["hits"], self._stats["misses"],
+                             self.max_entries, len(self._entries))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _store(self, key, blob, expires):
+        if key in self._entries:
+            self._remove(key)
+        if len(blob) > self.max_bytes:
+            return
+        self._entries[key] = (expires, blob)
+        self._bytes += len(blob)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._stats["evictions"] += 1
+
+    def _remove(self, key):
+        _, blob = self._entries.pop(key)
+        self._bytes -= len(blob)
+
+    def _written(self):
+        self._uncommitted += 1
+        if self._uncommitted >= self.commit_every:
+            self._commit()
+
+    def _commit(self):
+        """Prune the disk tier and commit, in one transaction."""
+        self._db.execute(
+            "DELETE FROM results WHERE expires IS NOT NULL AND expires <= ?", (time.time(),)
+        )
+        if self.max_disk_entries is not None:
+            # INSERT OR REPLACE gives a row the next rowid, so low rowids are the
+            # oldest writes. Gaps left by deletes only make this keep fewer rows.
+            self._db.execute(
+                "DELETE FROM results WHERE rowid <= (SELECT MAX(rowid) FROM results) - ?",
+                (self.max_disk_entries,),
+            )
+        self._db.commit()
+        self._uncommitted = 0
@@ -1,38 +1,237 @@
-import spacy
-from grammar_checker.knowledge import LinguisticKnowledge
+from collections.abc import Mapping
+from itertools import islice
+from grammar_checker.agreement import agreement
+from grammar_checker.inflection import get_inflection
+from grammar_checker.knowledge import get_knowledge
+from grammar_checker.markers import find_markers
+from grammar_checker.models import get_nlp
+from grammar_checker.token_index import token_index
+
+# Context features that need the tagger/parser; the rest only need tokens.
+PARSE_FEATURES = frozenset({
+    "doc", "lemmas", "pos", "dep", "morph", "subjects", "verbs",
+    "objects", "proper_nouns", "noun_phrases", "agreement"
+})
+
+# Every key a sentence context can hold.
+FEATURES = PARSE_FEATURES | {"tokens", "markers"}
+
+# Streams backed by a store are read this many parse batches at a time, so
+# at most one window of stored entries is held while its misses are parsed.
+WINDOW_BATCHES = 16
+
+# Columns of Doc.to_array backing a SentenceContext.
+_POS, _TAG, _DEP, _LEMMA, _HEAD = range(5)
+
+class SentenceContext(Mapping):
+    """Read-only context for one parsed sentence, computed lazily.
+
+    Per-token attributes come from a single ``Doc.to_array`` call over POS,
+    TAG, DEP, LEMMA and HEAD; each view ('pos', 'subjects', 'noun_phrases',
+    ...) is derived from the columns or the Doc on first access and then
+    kept. ``features`` limits the keys the context exposes.
+    """
+
+    __slots__ = ("doc", "_features", "_values", "_columns")
+
+    def __init__(self, doc, features=None):
+        self.doc = doc
+        self._features = FEATURES if features is None else FEATURES.intersection(features)
+        self._values = {}
+        self._columns = None
+
+    def __getitem__(self, key):
+        if key not in self._features:
+            raise KeyError(key)
+        return self._value(key)
+
+    def _value(self, key):
+        """Build or fetch a view, whether or not it is an exposed feature."""
+        try:
+            return self._values[key]
+        except KeyError:
+            value = self._values[key] = getattr(self, f"_build_{key}")()
+            return value
+
+    def __contains__(self, key):
+        return key in self._features
+
+    def __iter__(self):
+        return iter(self._features)
+
+    def __len__(self):
+        return len(self._features)
+
+    def prepare(self):
+        """Build every selected view and the shared per-Doc indexes now.
+
+        Used when timing a check, so that building structures the detectors
+        share is not charged to whichever detector touches them first.
+        """
+        if not PARSE_FEATURES.isdisjoint(self._features):
+            token_index(self.doc)
+        for key in self._features:
+            self._value(key)
+
+    @property
+    def columns(self):
+        """uint64 array of shape (len(doc), 5): POS, TAG, DEP, LEMMA, HEAD."""
+        if self._columns is None:
+            from spacy.attrs import POS, TAG, DEP, LEMMA, HEAD
+            self._columns = self.doc.to_array([POS, TAG, DEP, LEMMA, HEAD])
+        return self._columns
+
+    def heads(self):
+        """Absolute head index of every token."""
+        offsets = self.columns[:, _HEAD].astype("int64")
+        return [i + offset for i, offset in enumerate(offsets.tolist())]
+
+    def _strings(self, column):
+        """Decode one column of string ids."""
+        strings = self.doc.vocab.strings
+        return [strings[i] for i in self.columns[:, column].tolist()]
+
+    def _where(self, column, test):
+        doc = self.doc
+        return [doc[i] for i, name in enumerate(self._value(column)) if test(name)]
+
+    def _build_doc(self):
+        return self.doc
+
+    def _build_tokens(self):
+        return [token.text for token in self.doc]
+
+    def _build_lemmas(self):
+        return self._strings(_LEMMA)
+
+    def _build_pos(self):
+        return self._strings(_POS)
+
+    def _build_dep(self):
+        return self._strings(_DEP)
+
+    def _build_morph(self):
+        return [str(token.morph) for token in self.doc]
+
+    def _build_subjects(self):
+        return self._where("dep", lambda dep: "subj" in dep)
+
+    def _build_verbs(self):
+        return self._where("pos", lambda pos: pos == "VERB")
+
+    def _build_objects(self):
+        return self._where("dep", lambda dep: "obj" in dep)
+
+    def _build_proper_nouns(self):
+        return self._where("pos", lambda pos: pos == "PROPN")
+
+    def _build_noun_phrases(self):
+        return [chunk.text for chunk in self.doc.noun_chunks]
+
+    def _build_agreement(self):
+        return agreement(self.doc)
+
+    def _build_markers(self):
+        return find_markers([token.lower_ for token in self.doc])
+
+    def __repr__(self):
+        return f"SentenceContext({self.doc.text!r}, features={sorted(self._features)})"
 
 class ContextAnalyzer:
     """Context analyzer using spaCy and lemminflect."""
     
-    def __init__(self):
-        self.nlp = None
-        self.knowledge = LinguisticKnowledge()
-        
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except Exception as e:
-            print(f"Warning: spaCy model not available: {e}")
+    def __init__(self, parse_store=None):
+        """``parse_store`` is an optional ParseStore; parsed Docs found there
+        skip the pipeline, and new parses are added to it.
+        """
+        self.knowledge = get_knowledge()
+        self.parse_store = parse_store
+        # Sentences actually run through the pipeline (not tokenizer-only or stored Docs)
+        self.parse_count = 0
+        self._nlp = None
+        self._nlp_loaded = False
+
+    @property
+    def nlp(self):
+        """The shared spaCy pipeline, loaded on first use (None if unavailable)."""
+        if not self._nlp_loaded:
+            self._nlp = get_nlp()
+            self._nlp_loaded = True
+        return self._nlp
 
-    def analyze(self, sentence: str):
-        """Analyze sentence context."""
+    def analyze(self, sentence: str, features=None):
+        """Analyze sentence context.
+
+        ``features`` limits the context to the named keys; None builds all of
+        them. When none of the requested features needs the parse, only the
+        tokenizer runs.
+        """
         if self.nlp is None:
             return self._fallback_analysis(sentence)
 
-        doc = self.nlp(sentence)
-        
-        return {
-            "doc": doc,
-            "tokens": [token.text for token in doc],
-            "lemmas": [token.lemma_ for token in doc],
-            "pos": [token.pos_ for token in doc],
-            "dep": [token.dep_ for token in doc],
-            "morph": [str(token.morph) for token in doc],
-            "subjects": [token for token in doc if "subj" in token.dep_],
-            "verbs": [token for token in doc if token.pos_ == "VERB"],
-            "objects": [token for token in doc if "obj" in token.dep_],
-            "proper_nouns": [token for token in doc if token.pos_ == "PROPN"],
-            "noun_phrases": [chunk.text for chunk in doc.noun_chunks]
-        }
+        if self._needs_parse(features):
+            doc = self.parse_store.get(sentence) if self.parse_store is not None else None
+            if doc is None:
+                doc = self.nlp(sentence)
+                self.parse_count += 1
+                if self.parse_store is not None:
+                    self.parse_store.put(sentence, doc)
+        else:
+            doc = self.nlp.make_doc(sentence)
+        return self._build_context(doc, features)
+
+    def analyze_many(self, sentences, batch_size=64, n_process=1, features=None):
+        """Analyze a stream of sentences with nlp.pipe, yielding contexts in input order."""
+        if self.nlp is None:
+            for sentence in sentences:
+                yield self._fallback_analysis(sentence)
+            return
+
+        if self._needs_parse(features) and self.parse_store is not None:
+            docs = self._pipe_with_store(sentences, batch_size, n_process)
+        elif self._needs_parse(features):
+            docs = self._pipe(sentences, batch_size, n_process)
+        else:
+            docs = (self.nlp.make_doc(sentence) for sentence in sentences)
+
+        for doc in docs:
+            yield self._build_context(doc, features)
+
+    def _pipe_with_store(self, sentences, batch_size, n_process):
+        """Yield Docs in input order, parsing only sentences missing from the store."""
+        iterator = iter(sentences)
+        while True:
+            window = list(islice(iterator, batch_size * WINDOW_BATCHES))
+            if not window:
+                return
+
+            docs = [self.parse_store.get(sentence) for sentence in window]
+            # A sentence repeated within the window is parsed once
+            misses = list(dict.fromkeys(sentence for sentence, doc in zip(window, docs) if doc is None))
+            parsed = zip(misses, self._pipe(misses, batch_size, n_process)) if misses else iter(())
+            new_docs = {}
+            for sentence, doc in zip(window, docs):
+                if doc is None:
+                    doc = new_docs.get(sentence)
+                if doc is None:
+                    # Misses are parsed lazily, in the order they are needed
+                    parsed_sentence, doc = next(parsed)
+                    new_docs[parsed_sentence] = doc
+                    self.parse_store.put(parsed_sentence, doc)
+                yield doc
+
+    def _pipe(self, sentences, batch_size, n_process):
+        """nlp.pipe, counting each Doc it parses."""
+        for doc in self.nlp.pipe(sentences, batch_size=batch_size, n_process=n_process):
+            self.parse_count += 1
+            yield doc
+
+    def _needs_parse(self, features):
+        return features is None or not PARSE_FEATURES.isdisjoint(features)
+
+    def _build_context(self, doc, features=None):
+        """Wrap a parsed Doc in a lazily evaluated SentenceContext."""
+        return SentenceContext(doc, features)
 
     def _fallback_analysis(self, sentence):
         """Fallback when spaCy is unavailable."""
@@ -48,14 +247,14 @@ class ContextAnalyzer:
             "verbs": [],
             "objects": [],
             "proper_nouns": [token for token in tokens if token and token[0].isupper()],
-            "noun_phrases": []
+            "noun_phrases": [],
+            "markers": find_markers([token.lower() for token in tokens])
         }
 
     def get_verb_inflection(self, base_verb, form='VBD'):
         """Get verb inflection using lemminflect."""
         try:
-            import lemminflect
-            inflections = lemminflect.getInflection(base_verb, form)
+            inflections = get_inflection(base_verb, form)
             return inflections[0] if inflections else None
         except Exception as e:
             print(f"Lemminflect error for '{base_verb}': {e}")
@@ -1,66 +1,245 @@
-import spacy
-from grammar_checker.context import ContextAnalyzer
-from grammar_checker.detectors.article import ArticleDetector
-from grammar_checker.detectors.confusion_set import ConfusionSetDetector
-from grammar_checker.detectors.preposition import PrepositionDetector
-from grammar_checker.detectors.subject_verb_agreement import SubjectVerbAgreementDetector
-from grammar_checker.detectors.tense_consistency import TenseConsistencyDetector
-from grammar_checker.detectors.helping_verb import HelpingVerbDetector
+import copy
+from collections import deque
+from itertools import islice
+from grammar_checker.cache import normalize_text
+from grammar_checker.context import WINDOW_BATCHES, ContextAnalyzer, SentenceContext
+from grammar_checker.document import DEFAULT_CHUNK_SIZE, add_error_offsets, iter_sentences
+from grammar_checker.edits import apply_edits, resolve_edits
+from grammar_checker.inflection import inflection_cache_info
+from grammar_checker.instrumentation import NULL_METRICS
+from grammar_checker.knowledge import is_mass_noun
+from grammar_checker.detectors import DETECTORS, default_detectors
+from grammar_checker.detectors.registry import required_features, resolve_detectors
 
 class GrammarChecker:
-    def __init__(self):
-        self.context_analyzer = ContextAnalyzer()
-        self.article_detector = ArticleDetector()
-        # self.confusion_detector = ConfusionSetDetector()
-        self.preposition_detector = PrepositionDetector()
-        self.subject_verb_detector = SubjectVerbAgreementDetector()
-        self.tense_detector = TenseConsistencyDetector()
-        self.helping_verb_detector = HelpingVerbDetector() 
-
-    def check(self, sentence: str):
-        """Check grammar of a sentence."""
-        context = self.context_analyzer.analyze(sentence)
+    def __init__(self, instrumentation=None, detectors=None, cache=None, parse_store=None):
+        """``detectors`` names the detectors run by default (see DETECTORS);
+        None enables every detector registered with ``default = True``.
+
+        ``cache`` is an optional ResultCache. With a cache, sentences are
+        checked in their normalized form (see normalize_text) so that hits and
+        misses return identical results. ``parse_store`` is an optional
+        ParseStore so re-checking the same sentences skips the spaCy pipeline.
+        """
+        self.instrumentation = instrumentation
+        self.cache = cache
+        if instrumentation is not None:
+            instrumentation.register_cache('inflection', inflection_cache_info)
+            instrumentation.register_cache('mass_noun', is_mass_noun.cache_info)
+            if cache is not None:
+                instrumentation.register_cache('result', cache.cache_info)
+
+        self.context_analyzer = ContextAnalyzer(parse_store=parse_store)
+        self.enabled = resolve_detectors(default_detectors() if detectors is None else detectors)
+        # Detector instances are created on first use and shared across requests.
+        self._instances = {}
+        self._selections = {}
+
+    @property
+    def detectors(self):
+        """(name, detector) pairs for the default selection."""
+        return self._select(None)[0]
+
+    def get_detector(self, name):
+        """Return the shared instance of a registered detector."""
+        if name not in self._instances:
+            if name not in DETECTORS:
+                raise ValueError(f"Unknown detector(s): {name}")
+            self._instances[name] = DETECTORS[name]()
+        return self._instances[name]
+
+    def _select(self, detectors):
+        """Resolve a per-request selection to (name, detector) pairs and context features."""
+        key = None if detectors is None else frozenset(detectors)
+        if key not in self._selections:
+            names = self.enabled if key is None else resolve_detectors(key)
+            selected = [(name, self.get_detector(name)) for name in names]
+            # Tokens are always needed to build the corrected sentence.
+            features = required_features(names) | {'tokens'}
+            self._selections[key] = (selected, features)
+        return self._selections[key]
+
+    def check(self, sentence: str, detectors=None, include_doc=False):
+        """Check grammar of a sentence.
+
+        ``detectors`` restricts this request to the named detectors; only the
+        context features they need are computed. With ``include_doc`` the
+        parsed spaCy Doc is returned as result['doc'] (such requests bypass
+        the result cache).
+        """
+        selected, features = self._select(detectors)
+        if include_doc:
+            features = features | {'doc'}
+        metrics = self._start_metrics()
+
+        key = None
+        if self.cache is not None and not include_doc:
+            with metrics.time('cache'):
+                sentence = normalize_text(sentence)
+                key = self.cache.key(sentence, [name for name, _ in selected])
+                result = self.cache.get(key)
+            if result is not None:
+                if metrics is not NULL_METRICS:
+                    self.instrumentation.finish(metrics)
+                return result
+
+        parses = self.context_analyzer.parse_count
+        with metrics.time('parse'):
+            context = self.context_analyzer.analyze(sentence, features=features)
+        result = self._check_context(context, metrics, selected,
+                                     self.context_analyzer.parse_count - parses)
+
+        if key is not None:
+            self.cache.put(key, result)
+        if include_doc:
+            result['doc'] = context.get('doc')
+        return result
+
+    def check_many(self, sentences, batch_size=64, n_process=1, detectors=None):
+        """Check an iterable of sentences, yielding results in input order.
+
+        Sentences are streamed through nlp.pipe in batches of ``batch_size``;
+        ``n_process`` > 1 lets spaCy parse on several worker processes.
+        """
+        selected, features = self._select(detectors)
+        if self.cache is not None:
+            yield from self._check_many_cached(sentences, batch_size, n_process, selected, features)
+            return
+
+        yield from self._check_stream(sentences, batch_size, n_process, selected, features)
+
+    def _check_stream(self, sentences, batch_size, n_process, selected, features):
+        contexts = self.context_analyzer.analyze_many(
+            sentences, batch_size=batch_size, n_process=n_process, features=features
+        )
+        while True:
+            metrics = self._start_metrics()
+            # Parse time here is the wait for the next Doc from nlp.pipe,
+            # so batch parsing cost lands on the first sentence of each batch.
+            parses = self.context_analyzer.parse_count
+            with metrics.time('parse'):
+                context = next(contexts, None)
+            if context is None:
+                return
+            yield self._check_context(context, metrics, selected,
+                                      self.context_analyzer.parse_count - parses)
+
+    def _check_many_cached(self, sentences, batch_size, n_process, selected, features):
+        """check_many with result caching: only cache misses go through nlp.pipe.
+
+        Input is read in windows of ``batch_size * WINDOW_BATCHES`` sentences,
+        so memory stays bounded however many of them are cache hits.
+        """
+        names = [name for name, _ in selected]
+        iterator = iter(sentences)
+        while True:
+            window = [normalize_text(sentence) for sentence in islice(iterator, batch_size * WINDOW_BATCHES)]
+            if not window:
+                return
+
+            keys = [self.cache.key(text, names) for text in window]
+            cached = [self.cache.get(key) for key in keys]
+            # A sentence repeated within the window is checked once
+            misses = dict((key, text) for key, text, result in zip(keys, window, cached) if result is None)
+            results = self._check_stream(misses.values(), batch_size, n_process, selected, features)
+            checked = {}
+            for key, result in zip(keys, cached):
+                if result is None and key in checked:
+                    # Repeats get their own copy, like cache hits do
+                    result = copy.deepcopy(checked[key])
+                elif result is None:
+                    result = next(results)
+                    self.cache.put(key, result)
+                    checked[key] = result
+                yield result
+
+    def iter_check(self, source, batch_size=64, n_process=1, chunk_size=DEFAULT_CHUNK_SIZE,
+                   detectors=None):
+        """Check a whole document sentence by sentence.
+
+        ``source`` is a string or a text file-like object. Yields one result per
+        sentence with its absolute 'start'/'end' character offsets and 'text';
+        each error with a suggestion also gets an absolute 'offset' and 'length'.
+        Memory stays bounded by the current sentence and parse batch.
+        """
+        spans = deque()
+
+        def texts():
+            for start, end, text in iter_sentences(source, chunk_size=chunk_size):
+                spans.append((start, end, text))
+                yield text
+
+        for result in self.check_many(texts(), batch_size=batch_size, n_process=n_process,
+                                      detectors=detectors):
+            start, end, text = spans.popleft()
+            add_error_offsets(result, text, start)
+            result['start'] = start
+            result['end'] = end
+            result['text'] = text
+            yield result
+
+    def check_document(self, source, **kwargs):
+        """Check a whole document and return the list of per-sentence results."""
+        return list(self.iter_check(source, **kwargs))
+
+    def _start_metrics(self):
+        """Per-request metrics, or a no-op stand-in when instrumentation is off."""
+        if self.instrumentation is None:
+            return NULL_METRICS
+        return self.instrumentation.start()
+
+    def _check_context(self, context, metrics=NULL_METRICS, selected=None, parses=0):
+        """Run the selected detectors (default: all enabled) on an analyzed sentence.
+
+        ``parses`` is how many pipeline runs producing the context took, for
+        the parse_invocations counter.
+        """
+        if selected is None:
+            selected = self.detectors
+        if metrics is not NULL_METRICS and isinstance(context, SentenceContext):
+            # Shared structures get their own stage instead of being charged
+            # to the first detector that reads them
+            with metrics.time('analysis'):
+                context.prepare()
 
         errors = []
-        errors.extend(self.article_detector.detect(context))
-        # errors.extend(self.confusion_detector.detect(context))
-        errors.extend(self.preposition_detector.detect(context))
-        errors.extend(self.subject_verb_detector.detect(context))
-        errors.extend(self.tense_detector.detect(context))
-        errors.extend(self.helping_verb_detector.detect(context))
+        for name, detector in selected:
+            with metrics.time(name):
+                found = detector.detect(context)
+            for error in found:
+                error['detector'] = name
+            errors.extend(found)
 
-        suggestions = [e.get('suggestion') for e in errors if e.get('suggestion')]
-        corrected_tokens = self._apply_suggestions(context.get('tokens', []), suggestions)
-        corrected_sentence = ' '.join(corrected_tokens)
+        with metrics.time('suggestions'):
+            corrected_tokens, dropped = self._apply_suggestions(context.get('tokens', []), errors)
+            corrected_sentence = ' '.join(corrected_tokens)
+
+        if metrics is not NULL_METRICS:
+            metrics.count('parse_invocations', parses)
+            metrics.count('errors', len(errors))
+            self.instrumentation.finish(metrics)
 
         return {
             'errors': errors,
             'corrected_sentence': corrected_sentence,
-            'original_tokens': context.get('tokens', [])
+            'original_tokens': context.get('tokens', []),
+            'dropped_suggestions': dropped
         }
 
-    def _apply_suggestions(self, tokens, suggestions):
-        """Apply suggestions to token list and fix punctuation spacing."""
-        if not suggestions:
-            return self._fix_punctuation_spacing(tokens)
+    def _apply_suggestions(self, tokens, errors):
+        """Apply the errors' suggestions to the token list and fix punctuation spacing.
 
-        tokens_out = list(tokens)
-        offset = 0
-        
-        for s in sorted(suggestions, key=lambda x: x.get('index', 0)):
-            typ = s.get('type')
-            idx = s.get('index', 0) + offset
-            
-            if typ == 'replace' and 0 <= idx < len(tokens_out):
-                tokens_out[idx] = s.get('word', tokens_out[idx])
-            elif typ == 'remove' and 0 <= idx < len(tokens_out):
-                tokens_out.pop(idx)
-                offset -= 1
-            elif typ == 'insert' and 0 <= idx <= len(tokens_out):
-                tokens_out.insert(idx, s.get('word'))
-                offset += 1
-
-        return self._fix_punctuation_spacing(tokens_out)
+        Overlapping suggestions are resolved by detector priority; returns the
+        corrected tokens and the errors whose suggestions were dropped.
+        """
+        edits, dropped = resolve_edits(errors, len(tokens), self._edit_priority)
+        if not edits:
+            return self._fix_punctuation_spacing(tokens), dropped
+        return self._fix_punctuation_spacing(apply_edits(tokens, edits)), dropped
+
+    def _edit_priority(self, error):
+        cls = DETECTORS.get(error.get('detector'))
+        return getattr(cls, 'priority', 100)
 
     def _fix_punctuation_spacing(self, tokens):
         """Remove spaces before punctuation."""
@@ -1,15 +1,21 @@
+from .registry import DETECTORS, default_detectors, register_detector
 from .article import ArticleDetector
 from .confusion_set import ConfusionSetDetector
 from .preposition import PrepositionDetector
 from .subject_verb_agreement import SubjectVerbAgreementDetector
 from .tense_consistency import TenseConsistencyDetector
+from .helping_verb import HelpingVerbDetector
 from .spelling import SpellingDetector
 
 __all__ = [
+    "DETECTORS",
+    "default_detectors",
+    "register_detector",
     "ArticleDetector",
     "ConfusionSetDetector",
     "PrepositionDetector",
     "SubjectVerbAgreementDetector",
     "TenseConsistencyDetector",
+    "HelpingVerbDetector",
     "SpellingDetector"
 ]
\ No newline at end of file
@@ -1,18 +1,24 @@
-from grammar_checker.knowledge import LinguisticKnowledge
+from collections.abc import Mapping
+from grammar_checker.knowledge import get_knowledge
+from grammar_checker.detectors.registry import register_detector
 import re
-import spacy
+from grammar_checker.token_index import token_index
 
+PROPER_NOUN_INDEX_KEY = "article_proper_nouns"
+
+@register_detector
 class ArticleDetector:
+    name = "article"
+    requires = frozenset({"doc"})
+    default = True
+    priority = 30
+
     def __init__(self):
-        self.knowledge = LinguisticKnowledge()
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            self.nlp = None
+        self.knowledge = get_knowledge()
 
     def detect(self, sentence_or_context):
         """Detect article errors."""
-        if isinstance(sentence_or_context, dict):
+        if isinstance(sentence_or_context, Mapping):
             doc = sentence_or_context.get('doc')
             tokens = sentence_or_context.get('tokens', [])
             if doc is None:
@@ -23,17 +29,18 @@ class ArticleDetector:
     def _detect_with_context(self, doc, tokens):
         """Detect article errors using context."""
         errors = []
+        index = token_index(doc)
+        articles = [token for token in index.words('a', 'an', 'the') if token.i + 1 < len(doc)]
 
-        for i, token in enumerate(doc):
-            if token.text.lower() in ['a', 'an', 'the'] and i + 1 < len(doc):
-                next_token = doc[i + 1]
-                errors.extend(self._check_article_usage(token, next_token, i))
+        for token in articles:
+            next_token = doc[token.i + 1]
+            errors.extend(self._check_article_usage(token, next_token, token.i))
 
         # Missing articles before singular countable nouns
-        errors.extend(self._detect_missing_articles(doc))
+        errors.extend(self._detect_missing_articles(doc, index.pos("NOUN")))
 
         # Extra articles before proper nouns and other zero-article cases
-        errors.extend(self._detect_extra_articles(doc))
+        errors.extend(self._detect_extra_articles(doc, articles))
 
         return errors
 
@@ -121,18 +128,28 @@ class ArticleDetector:
         return False
 
     def _is_proper_noun(self, token):
-        """Robust proper noun detection using multiple methods."""
-        # Method 1: Use spaCy POS tagging if available
-        if self.nlp and len(token.text) > 1:
-            doc = self.nlp(token.text)
-            if doc[0].pos_ == "PROPN":
-                return True
-
-        # Method 2: Use existing spaCy doc POS tagging
+        """Proper noun detection from the sentence parse and capitalization.
+
+        The per-Doc bitmap is the whole answer: words are not re-tagged on
+        their own, so the check never runs the pipeline again.
+        """
+        return self._proper_noun_index(token.doc)[token.i]
+
+    def _proper_noun_index(self, doc):
+        """Per-Doc proper-noun bitmap, built once and kept in doc.user_data."""
+        index = doc.user_data.get(PROPER_NOUN_INDEX_KEY)
+        if index is None:
+            index = [self._looks_proper(token) for token in doc]
+            doc.user_data[PROPER_NOUN_INDEX_KEY] = index
+        return index
+
+    def _looks_proper(self, token):
+        """Proper noun check from the sentence parse and capitalization rules."""
+        # Use existing spaCy doc POS tagging
         if token.pos_ == "PROPN":
             return True
 
-        # Method 3: Capitalization rules (most reliable fallback)
+        # Capitalization rules (most reliable fallback)
         if (token.text[0].isupper() and 
             len(token.text) > 1 and 
             not token.text.isupper() and  # Exclude ALL CAPS
@@ -168,13 +185,14 @@ class ArticleDetector:
         return False
 
 
-    def _detect_missing_articles(self, doc):
+    def _detect_missing_articles(self, doc, nouns):
         """Detect missing articles before singular, countable nouns."""
         errors = []
 
-        for i, token in enumerate(doc):
+        for token in nouns:
+            i = token.i
             # Only singular nouns
-            if token.pos_ == "NOUN" and token.tag_ in ["NN", "NNP"]:
+            if token.tag_ in ["NN", "NNP"]:
                 
                 # Skip if it's actually a proper noun
                 if self._is_proper_noun(token):
@@ -223,29 +241,29 @@ class ArticleDetector:
 
         return errors
 
-    def _detect_extra_articles(self, doc):
+    def _detect_extra_articles(self, doc, articles):
         """Detect unnecessary articles before proper nouns and other cases."""
         errors = []
         
-        for i, token in enumerate(doc):
-            if token.text.lower() in ['a', 'an', 'the'] and i + 1 < len(doc):
-                next_token = doc[i + 1]
-                
-                # Check if article is before a proper noun
-                if self._is_proper_noun(next_token) and not self._is_exception_case(next_token):
-                    errors.append({
-                        'pos': i,
-                        'message': f"Unnecessary article before proper noun '{next_token.text}'",
-                        'suggestion': {'type': 'remove', 'index': i}
-                    })
-                
-                # Check for other zero-article cases
-                elif self._should_be_zero_article(next_token):
-                    errors.append({
-                        'pos': i,
-                        'message': f"Unnecessary article before '{next_token.text}'",
-                        'suggestion': {'type': 'remove', 'index': i}
-                    })
+        for token in articles:
+            i = token.i
+            next_token = doc[i + 1]
+            
+            # Check if article is before a proper noun
+            if self._is_proper_noun(next_token) and not self._is_exception_case(next_token):
+                errors.append({
+                    'pos': i,
+                    'message': f"Unnecessary article before proper noun '{next_token.text}'",
+                    'suggestion': {'type': 'remove', 'index': i}
+                })
+            
+            # Check for other zero-article cases
+            elif self._should_be_zero_article(next_token):
+                errors.append({
+                    'pos': i,
+                    'message': f"Unnecessary article before '{next_token.text}'",
+                    'suggestion': {'type': 'remove', 'index': i}
+                })
         
         return errors
 
@@ -1,12 +1,23 @@
-from grammar_checker.knowledge import LinguisticKnowledge
+from collections.abc import Mapping
+from grammar_checker.knowledge import get_knowledge
+from grammar_checker.detectors.registry import register_detector
+from grammar_checker.token_index import token_index
 import re
-from collections import defaultdict
 
+@register_detector
 class ConfusionSetDetector:
+    name = "confusion"
+    requires = frozenset({"doc", "tokens", "pos"})
+    default = True
+    priority = 50
+
     def __init__(self):
-        self.knowledge = LinguisticKnowledge()
+        self.knowledge = get_knowledge()
         self.CONFUSION_SETS = self._build_comprehensive_confusion_sets()
+        # Sentences containing none of these words are skipped outright
+        self._triggers = frozenset(self.CONFUSION_SETS)
         self._build_context_patterns()
+        self.collocations = self._build_collocations()
         
     def _build_comprehensive_confusion_sets(self):
         """Build comprehensive confusion sets with semantic groupings."""
@@ -167,9 +178,34 @@ class ConfusionSetDetector:
             }
         }
 
+        # Precompiled lookups: word sets, and one alternation of all the
+        # patterns for each word.
+        self._follows = {}
+        self._precedes = {}
+        self._pattern_res = {}
+        for word, patterns in self.context_patterns.items():
+            self._follows[word] = frozenset(patterns.get('follows', []))
+            self._precedes[word] = frozenset(patterns.get('precedes', []))
+            combined = '|'.join(f'(?:{pattern})' for pattern in patterns.get('patterns', []))
+            self._pattern_res[word] = re.compile(combined, re.IGNORECASE)
+
+    def _build_collocations(self):
+        """Words that commonly appear near each confusion word."""
+        return {
+            'their': frozenset(['friend', 'house', 'car', 'family', 'home', 'child', 'parent', 'job', 'work', 'own']),
+            'there': frozenset(['is', 'are', 'was', 'were', 'has', 'have', 'had', 'here', 'over', 'right', 'up']),
+            "they're": frozenset(['going', 'coming', 'waiting', 'working', 'studying', 'trying', 'planning', 'here']),
+            'your': frozenset(['name', 'house', 'car', 'family', 'friend', 'home', 'phone', 'email', 'address']),
+            "you're": frozenset(['going', 'coming', 'waiting', 'working', 'welcome', 'right', 'sure', 'here']),
+            'affect': frozenset(['will', 'can', 'may', 'might', 'could', 'would', 'negatively', 'positively', 'directly']),
+            'effect': frozenset(['the', 'on', 'of', 'side', 'adverse', 'positive', 'negative', 'significant']),
+            'then': frozenset(['and', 'but', 'since', 'until', 'before', 'after', 'now', 'back', 'right']),
+            'than': frozenset(['more', 'less', 'better', 'worse', 'bigger', 'smaller', 'rather', 'other', 'ever'])
+        }
+
     def detect(self, sentence_or_context):
         """Enhanced confusion word detection with comprehensive analysis."""
-        if isinstance(sentence_or_context, dict):
+        if isinstance(sentence_or_context, Mapping):
             tokens = sentence_or_context.get('tokens', [])
             pos_tags = sentence_or_context.get('pos', [])
             doc = sentence_or_context.get('doc')
@@ -178,21 +214,29 @@ class ConfusionSetDetector:
             pos_tags = []
             doc = None
 
+        if doc is not None:
+            index = token_index(doc)
+            present = self._triggers.intersection(index.by_lower)
+            if not present:
+                return []
+            candidates = [token.i for token in index.words(*present) if token.i < len(tokens)]
+
+        # The context helpers below all take lowercased tokens
+        lowered = [word.lower() for word in tokens]
+        if doc is None:
+            candidates = [i for i, word in enumerate(lowered) if word in self._triggers]
+
         errors = []
-        
-        for i, word in enumerate(tokens):
-            lw = word.lower()
-            
-            if lw in self.CONFUSION_SETS:
-                correct_word = self._analyze_context(i, tokens, pos_tags, doc)
-                if correct_word and correct_word != lw:
-                    errors.append(self._create_error(i, word, correct_word, tokens))
-                        
+        for i in candidates:
+            correct_word = self._analyze_context(i, lowered, pos_tags, doc)
+            if correct_word and correct_word != lowered[i]:
+                errors.append(self._create_error(i, tokens[i], correct_word, tokens))
+
         return errors
 
     def _analyze_context(self, index, tokens, pos_tags, doc):
         """Comprehensive context analysis to determine correct word."""
-        word = tokens[index].lower()
+        word = tokens[index]
         alternatives = self.CONFUSION_SETS[word]
         
         # Method 1: Check context patterns first
@@ -222,35 +266,26 @@ class ConfusionSetDetector:
         """Check context patterns for the given word."""
         if word not in self.context_patterns:
             return None
-            
-        patterns = self.context_patterns[word]
-        context_text = ' '.join(tokens[max(0, index-2):min(len(tokens), index+3)]).lower()
-        
+
         # Check preceding words
-        if index > 0:
-            prev_word = tokens[index-1].lower()
-            if prev_word in patterns.get('follows', []):
-                return word  # Context suggests current word is correct
-        
-        # Check following words  
-        if index < len(tokens) - 1:
-            next_word = tokens[index+1].lower()
-            if next_word in patterns.get('precedes', []):
-                return word  # Context suggests current word is correct
-        
+        if index > 0 and tokens[index-1] in self._follows[word]:
+            return word  # Context suggests current word is correct
+
+        # Check following words
+        if index < len(tokens) - 1 and tokens[index+1] in self._precedes[word]:
+            return word  # Context suggests current word is correct
+
         # Check regex patterns
-        for pattern in patterns.get('patterns', []):
-            if re.search(pattern, context_text, re.IGNORECASE):
-                return word  # Pattern matches current word
-        
+        context_text = ' '.join(tokens[max(0, index-2):min(len(tokens), index+3)])
+        if self._pattern_res[word].search(context_text):
+            return word  # Pattern matches current word
+
         # Check if alternative might be better
         for alternative in self.CONFUSION_SETS[word]:
-            if alternative in self.context_patterns:
-                alt_patterns = self.context_patterns[alternative]
-                for pattern in alt_patterns.get('patterns', []):
-                    if re.search(pattern, context_text, re.IGNORECASE):
-                        return alternative
-        
+            pattern_re = self._pattern_res.get(alternative)
+            if pattern_re is not None and pattern_re.search(context_text):
+                return alternative
+
         return None
 
     def _pos_based_analysis(self, word, index, tokens, pos_tags):
@@ -314,11 +349,11 @@ class ConfusionSetDetector:
 
     def _collocation_analysis(self, word, alternatives, index, tokens):
         """Analyze word collocations to determine correct usage."""
-        context_text = ' '.join(tokens[max(0, index-3):min(len(tokens), index+4)]).lower()
-        
+        context_words = set(tokens[max(0, index-3):min(len(tokens), index+4)])
+
         collocation_scores = {}
         for alternative in [word] + alternatives:
-            collocation_scores[alternative] = self._calculate_collocation_score(alternative, context_text)
+            collocation_scores[alternative] = self._calculate_collocation_score(alternative, context_words)
         
         best_match = max(collocation_scores.items(), key=lambda x: x[1])
         if best_match[1] > 0.5:  # Confidence threshold
@@ -326,29 +361,13 @@ class ConfusionSetDetector:
             
         return None
 
-    def _calculate_collocation_score(self, word, context):
-        """Calculate collocation score for a word in context."""
-        common_collocations = {
-            'their': ['friend', 'house', 'car', 'family', 'home', 'child', 'parent', 'job', 'work', 'own'],
-            'there': ['is', 'are', 'was', 'were', 'has', 'have', 'had', 'here', 'over', 'right', 'up'],
-            "they're": ['going', 'coming', 'waiting', 'working', 'studying', 'trying', 'planning', 'here'],
-            'your': ['name', 'house', 'car', 'family', 'friend', 'home', 'phone', 'email', 'address'],
-            "you're": ['going', 'coming', 'waiting', 'working', 'welcome', 'right', 'sure', 'here'],
-            'affect': ['will', 'can', 'may', 'might', 'could', 'would', 'negatively', 'positively', 'directly'],
-            'effect': ['the', 'on', 'of', 'side', 'adverse', 'positive', 'negative', 'significant'],
-            'then': ['and', 'but', 'since', 'until', 'before', 'after', 'now', 'back', 'right'],
-            'than': ['more', 'less', 'better', 'worse', 'bigger', 'smaller', 'rather', 'other', 'ever']
-        }
-        
-        if word not in common_collocations:
+    def _calculate_collocation_score(self, word, context_words):
+        """Share of a word's collocates found among the context words."""
+        collocates = self.collocations.get(word)
+        if not collocates:
             return 0
-            
-        score = 0
-        for collocate in common_collocations[word]:
-            if collocate in context:
-                score += 1
-                
-        return score / len(common_collocations[word])
+
+        return len(collocates & context_words) / len(collocates)
 
     def _analyze_their_there_theyre(self, word, context_words):
         """Specialized analysis for their/there/they're confusion."""
@@ -418,7 +437,7 @@ class ConfusionSetDetector:
         """Get extended context around the target word."""
         start = max(0, index - window)
         end = min(len(tokens), index + window + 1)
-        return [tokens[i].lower() for i in range(start, end) if i != index]
+        return tokens[start:index] + tokens[index+1:end]
 
     def _create_error(self, index, original_word, correct_word, tokens):
         """Create an error dictionary with enhanced messaging."""
@@ -1,13 +1,22 @@
-from grammar_checker.knowledge import LinguisticKnowledge
-import lemminflect
+from collections.abc import Mapping
+from grammar_checker.knowledge import get_knowledge
+from grammar_checker.detectors.registry import register_detector
+from grammar_checker.agreement import agreement
+from grammar_checker.token_index import token_index
 
+@register_detector
 class HelpingVerbDetector:
+    name = "helping_verb"
+    requires = frozenset({"doc", "tokens", "agreement"})
+    default = True
+    priority = 10
+
     def __init__(self):
-        self.knowledge = LinguisticKnowledge()
+        self.knowledge = get_knowledge()
 
     def detect(self, sentence_or_context):
         """Detect helping verb errors."""
-        if isinstance(sentence_or_context, dict):
+        if isinstance(sentence_or_context, Mapping):
             doc = sentence_or_context.get('doc')
             tokens = sentence_or_context.get('tokens', [])
             if doc is None:
@@ -36,10 +45,12 @@ class HelpingVerbDetector:
                         'suggestion': {'type': 'replace', 'index': of_position, 'word': 'have'}
                     })
         
+        index = token_index(doc)
+
         # Check helping verb agreement for all auxiliary verbs
-        for token in doc:
-            if token.pos_ == "AUX" and token.lemma_ in ['be', 'have', 'do']:
-                subject = self._find_subject(token)
+        for token in index.lemmas('be', 'have', 'do'):
+            if token.pos_ == "AUX":
+                subject = agreement(doc).subject(token)
                 if subject:
                     correct_form = self._get_correct_helping_verb(token, subject)
                     if correct_form and correct_form.lower() != token.text.lower():
@@ -50,10 +61,9 @@ class HelpingVerbDetector:
                         })
         
         # Check main verb "have" for agreement
-        for token in doc:
-            if (token.pos_ == "VERB" and token.lemma_ == 'have' and 
-                token.dep_ in ["ROOT", "conj"]):
-                subject = self._find_subject(token)
+        for token in index.lemmas('have'):
+            if token.pos_ == "VERB" and token.dep_ in ["ROOT", "conj"]:
+                subject = agreement(doc).subject(token)
                 if subject and not self._check_have_agreement(token, subject):
                     correct_form = self._get_correct_have_form(subject)
                     if correct_form and correct_form.lower() != token.text.lower():
@@ -65,21 +75,6 @@ class HelpingVerbDetector:
         
         return errors
 
-    def _find_subject(self, verb_token):
-        """Find the subject of a verb."""
-        # Look for subjects in children
-        for child in verb_token.children:
-            if child.dep_ in ["nsubj", "nsubjpass"]:
-                return child
-        
-        # If no subject found in children, look for the head's subject
-        if verb_token.head != verb_token:
-            for child in verb_token.head.children:
-                if child.dep_ in ["nsubj", "nsubjpass"]:
-                    return child
-        
-        return None
-
     def _get_correct_helping_verb(self, aux_token, subject):
         """Get correct helping verb form with robust subject detection."""
         base_verb = aux_token.lemma_
@@ -105,7 +100,7 @@ class HelpingVerbDetector:
             # Past tense forms
             if subject_text == 'i':
                 return 'was' if current_form != 'was' else None
-            elif self._is_third_person_singular(subject):
+            elif agreement(subject.doc).is_third_person_singular(subject):
                 return 'was' if current_form != 'was' else None
             else:
                 return 'were' if current_form != 'were' else None
@@ -113,14 +108,14 @@ class HelpingVerbDetector:
             # Present tense forms
             if subject_text == 'i':
                 return 'am' if current_form != 'am' else None
-            elif self._is_third_person_singular(subject):
+            elif agreement(subject.doc).is_third_person_singular(subject):
                 return 'is' if current_form != 'is' else None
             else:
                 return 'are' if current_form != 'are' else None
 
     def _get_correct_have_form(self, subject, current_form=None):
         """Get correct form of 'have' verb."""
-        if self._is_third_person_singular(subject):
+        if agreement(subject.doc).is_third_person_singular(subject):
             return 'has' if not current_form or current_form != 'has' else None
         else:
             return 'have' if not current_form or current_form != 'have' else None
@@ -130,86 +125,18 @@ class HelpingVerbDetector:
         if is_past:
             return 'did' if current_form != 'did' else None
         else:
-            if self._is_third_person_singular(subject):
+            if agreement(subject.doc).is_third_person_singular(subject):
                 return 'does' if current_form != 'does' else None
             else:
                 return 'do' if current_form != 'do' else None
 
     def _check_have_agreement(self, have_token, subject):
         """Check if 'have' as main verb agrees with subject."""
-        if self._is_third_person_singular(subject):
+        if agreement(subject.doc).is_third_person_singular(subject):
             return have_token.text.lower() == 'has'
         else:
             return have_token.text.lower() == 'have'
 
-    def _is_third_person_singular(self, subject_token):
-        """Robust check if subject is third person singular."""
-        subject_text = subject_text = subject_token.text.lower()
-        
-        # Basic pronouns
-        third_singular_pronouns = {"he", "she", "it"}
-        if subject_text in third_singular_pronouns:
-            return True
-            
-        # First/second person pronouns
-        non_third_singular = {"i", "you", "we", "they"}
-        if subject_text in non_third_singular:
-            return False
-        
-        # Indefinite pronouns (singular)
-        indefinite_singular = {
-            'everyone', 'everybody', 'everything', 'someone', 'somebody', 
-            'something', 'anyone', 'anybody', 'anything', 'no one', 'nobody',
-            'nothing', 'each', 'either', 'neither'
-        }
-        if subject_text in indefinite_singular:
-            return True
-        
-        # Collective nouns (usually singular)
-        collective_nouns = {
-            'team', 'group', 'family', 'class', 'committee', 'jury', 'staff',
-            'government', 'company', 'organization', 'audience', 'band'
-        }
-        if subject_text in collective_nouns:
-            return True
-        
-        # Academic subjects (singular)
-        academic_singular = {
-            'mathematics', 'math', 'physics', 'economics', 'news', 'politics'
-        }
-        if subject_text in academic_singular:
-            return True
-        
-        # Check noun plurality
-        if subject_token.pos_ in ["NOUN", "PROPN"]:
-            return not self._is_plural_noun(subject_token)
-        
-        # Default to singular for unknown cases
-        return True
-
-    def _is_plural_noun(self, noun_token):
-        """Check if noun is plural."""
-        text_lower = noun_token.text.lower()
-        
-        # Common plural endings
-        if (text_lower.endswith('s') and 
-            not text_lower.endswith(('ss', 'us', 'is', 'as', 'os')) and
-            text_lower not in {
-                'news', 'mathematics', 'maths', 'physics', 'economics', 
-                'politics', 'ethics', 'linguistics', 'statistics'
-            }):
-            return True
-        
-        # Irregular plurals
-        irregular_plurals = {
-            'children', 'men', 'women', 'people', 'feet', 'teeth', 
-            'mice', 'geese', 'oxen'
-        }
-        if text_lower in irregular_plurals:
-            return True
-        
-        return False
-
     def _is_past_tense(self, verb_token):
         """Check if verb is past tense."""
         if verb_token.morph.get("Tense"):
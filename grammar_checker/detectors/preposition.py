@@ -1,8 +1,15 @@
-from grammar_checker.knowledge import LinguisticKnowledge
+from grammar_checker.knowledge import get_knowledge
+from grammar_checker.detectors.registry import register_detector
 
+@register_detector
 class PrepositionDetector:
+    name = "preposition"
+    requires = frozenset({"tokens"})
+    default = True
+    priority = 40
+
     def __init__(self):
-        self.kb = LinguisticKnowledge()
+        self.kb = get_knowledge()
 
         # Universal replacement rules
         self.UNIVERSAL_RULES = {
@@ -0,0 +1,31 @@
+# Detector classes keyed by name, in registration order.
+DETECTORS = {}
+
+def register_detector(cls):
+    """Class decorator adding a detector to the registry.
+
+    A detector class declares ``name``, the context features it ``requires``
+    (e.g. 'doc', 'tokens', 'pos', 'markers'), whether it runs by ``default``
+    and the ``priority`` of its suggestions when they overlap another
+    detector's (lower wins).
+    """
+    DETECTORS[cls.name] = cls
+    return cls
+
+def default_detectors():
+    """Names of the detectors enabled when the caller does not choose."""
+    return tuple(name for name, cls in DETECTORS.items() if cls.default)
+
+def resolve_detectors(names):
+    """Validate detector names and return them in registry order."""
+    unknown = set(names) - DETECTORS.keys()
+    if unknown:
+        raise ValueError(f"Unknown detector(s): {', '.join(sorted(unknown))}")
+    return tuple(name for name in DETECTORS if name in names)
+
+def required_features(names):
+    """Union of the context features the given detectors need."""
+    features = set()
+    for name in names:
+        features.update(DETECTORS[name].requires)
+    return frozenset(features)
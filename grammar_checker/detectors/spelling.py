@@ -1,10 +1,19 @@
-from grammar_checker.knowledge import LinguisticKnowledge
+from grammar_checker.knowledge import get_knowledge
+from grammar_checker.detectors.registry import register_detector
 
+@register_detector
 class SpellingDetector:
+    name = "spelling"
+    requires = frozenset({"tokens"})
+    default = False
+    priority = 5
+
     def __init__(self):
-        self.knowledge = LinguisticKnowledge()
+        self.knowledge = get_knowledge()
 
-    def detect(self, tokens, pos_tags, context):
+    def detect(self, context):
+        """Detect common misspellings."""
+        tokens = context.get('tokens', [])
         errors = []
         
         for i, token in enumerate(tokens):
@@ -13,10 +22,9 @@ class SpellingDetector:
             if lower_token in self.knowledge.COMMON_MISS_SPELLINGS:
                 correct_spelling = self.knowledge.COMMON_MISS_SPELLINGS[lower_token]
                 errors.append({
-                    'position': i,
-                    'message': f"Possible spelling error: '{token}'",
-                    'suggestion': f"Did you mean '{correct_spelling}'?",
-                    'type': 'spelling'
+                    'pos': i,
+                    'message': f"Possible spelling error: '{token}'. Did you mean '{correct_spelling}'?",
+                    'suggestion': {'type': 'replace', 'index': i, 'word': correct_spelling}
                 })
         
         return errors
\ No newline at end of file
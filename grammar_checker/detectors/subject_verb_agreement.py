@@ -1,35 +1,48 @@
 # subject_verb_agreement.py
-from grammar_checker.knowledge import LinguisticKnowledge
-import lemminflect
+from collections.abc import Mapping
+from grammar_checker.knowledge import get_knowledge
+from grammar_checker.detectors.registry import register_detector
+from grammar_checker.markers import find_markers
+from grammar_checker.inflection import get_inflection
+from grammar_checker.agreement import agreement
+from grammar_checker.token_index import token_index
 
+@register_detector
 class SubjectVerbAgreementDetector:
+    name = "subject_verb"
+    requires = frozenset({"doc", "tokens", "markers", "agreement"})
+    default = True
+    priority = 20
+
     def __init__(self):
-        self.knowledge = LinguisticKnowledge()
+        self.knowledge = get_knowledge()
 
     def detect(self, sentence_or_context):
         """Detect subject-verb agreement errors ONLY in present simple tense."""
-        if isinstance(sentence_or_context, dict):
+        if isinstance(sentence_or_context, Mapping):
             doc = sentence_or_context.get('doc')
             tokens = sentence_or_context.get('tokens', [])
             if doc is None:
                 return []
-            return self._detect_present_simple_agreement(doc, tokens)
+            markers = sentence_or_context.get('markers')
+            if markers is None:
+                markers = find_markers([token.lower_ for token in doc])
+            return self._detect_present_simple_agreement(doc, tokens, markers)
         return []
 
-    def _detect_present_simple_agreement(self, doc, tokens):
+    def _detect_present_simple_agreement(self, doc, tokens, markers):
         """Detect agreement errors ONLY in present simple tense."""
         errors = []
         
         # First, check if the sentence is in present simple tense
-        if not self._is_present_simple_sentence(doc, tokens):
+        if not self._is_present_simple_sentence(doc, tokens, markers):
             return errors
         
-        for token in doc:
-            if (token.pos_ == "VERB" and 
-                token.dep_ in ["ROOT", "conj", "ccomp"] and
+        for token in token_index(doc).pos("VERB"):
+            if (token.dep_ in ["ROOT", "conj", "ccomp"] and
                 self._is_present_simple_verb(token)):
                 
-                subject = self._find_subject(token)
+                subject = agreement(doc).subject(token)
                 
                 if subject and not self._check_agreement(subject, token):
                     correct_form = self._get_correct_verb_form(token, subject)
@@ -42,21 +55,21 @@ class SubjectVerbAgreementDetector:
         
         return errors
 
-    def _is_present_simple_sentence(self, doc, tokens):
+    def _is_present_simple_sentence(self, doc, tokens, markers):
         """Check if the sentence is in present simple tense."""
-        sentence_text = ' '.join(tokens).lower()
+        words = {token.lower() for token in tokens}
         
         # Check for past/future markers that would exclude present simple
         past_markers = {'yesterday', 'ago', 'last', 'previous', 'earlier', 'before'}
-        future_markers = {'tomorrow', 'next', 'soon', 'later', 'will', 'shall'}
+        future_markers = {'tomorrow', 'next', 'soon', 'later'}
         
-        if any(marker in sentence_text for marker in past_markers):
+        if markers.has('past', past_markers):
             return False
-        if any(marker in sentence_text for marker in future_markers):
+        if markers.has('future', future_markers) or 'will' in words or 'shall' in words:
             return False
         
         # Check for continuous/perfect aspects
-        for token in doc:
+        for token in token_index(doc).lemmas("be", "have"):
             # If we find "be" + VBG (continuous) or "have" + VBN (perfect), not present simple
             if token.lemma_ == "be" and any(child.tag_ == "VBG" for child in token.children):
                 return False
@@ -84,110 +97,26 @@ class SubjectVerbAgreementDetector:
         if verb_text == base_verb:
             return True
             
-        third_person_forms = lemminflect.getInflection(base_verb, 'VBZ')
+        third_person_forms = get_inflection(base_verb, 'VBZ')
         if third_person_forms and verb_text == third_person_forms[0].lower():
             return True
             
         return False
 
-    def _find_subject(self, verb_token):
-        """Find the subject of a verb."""
-        for child in verb_token.children:
-            if child.dep_ in ["nsubj", "nsubjpass"]:
-                return child
-        return None
-
     def _check_agreement(self, subject, verb):
         """Check if subject and verb agree in present simple."""
-        if self._is_third_person_singular(subject):
+        if agreement(subject.doc).is_third_person_singular(subject):
             return self._is_third_person_singular_verb(verb)
         else:
             return not self._is_third_person_singular_verb(verb)
 
-    def _is_third_person_singular(self, subject_token):
-        """Check if subject is third person singular."""
-        if subject_token.morph.get("Person") and subject_token.morph.get("Number"):
-            return (str(subject_token.morph.get("Person")[0]) == "3" and 
-                    str(subject_token.morph.get("Number")[0]) == "Sing")
-        
-        # Pronouns
-        third_singular_pronouns = {"he", "she", "it"}
-        third_plural_pronouns = {"they", "we", "you", "i"}
-        
-        subject_text = subject_token.text.lower()
-        
-        if subject_text in third_singular_pronouns:
-            return True
-        elif subject_text in third_plural_pronouns:
-            return False
-        
-        # Special indefinite pronouns (always singular)
-        indefinite_singular = self.knowledge.INDEFINITE_SINGULAR
-        
-        if subject_text in indefinite_singular:
-            return True
-        
-        # Collective nouns (usually singular in American English)
-        collective_nouns = self.knowledge.COLLECTIVE_NOUNS
-
-        if subject_text in collective_nouns:
-            return True
-        
-        # Academic subjects (singular)
-        academic_singular = self.knowledge.ACADEMIC_SUBJECTS
-
-        if subject_text in academic_singular:
-            return True
-        
-        # Check for "each of", "every one of" patterns
-        if self._is_each_of_pattern(subject_token):
-            return True
-        
-        # Nouns - check if plural
-        if subject_token.pos_ in ["NOUN", "PROPN"]:
-            return not self._is_plural_noun(subject_token)
-        
-        return False
-
-    def _is_each_of_pattern(self, subject_token):
-        """Check for 'each of', 'every one of' patterns which are singular."""
-        # Look for "each" or "every" before the subject
-        if subject_token.i > 0:
-            prev_token = subject_token.doc[subject_token.i - 1]
-            if prev_token.text.lower() in ['each', 'every']:
-                return True
-        return False
-
-    def _is_plural_noun(self, noun_token):
-        """Check if noun is plural."""
-        text_lower = noun_token.text.lower()
-        
-        # Common plural endings
-        if (text_lower.endswith('s') and 
-            not text_lower.endswith(('ss', 'us', 'is', 'as', 'os')) and
-            text_lower not in {
-                'news', 'mathematics', 'maths', 'physics', 'economics', 
-                'politics', 'ethics', 'linguistics', 'statistics'
-            }):
-            return True
-        
-        # Irregular plurals
-        irregular_plurals = {
-            'children', 'men', 'women', 'people', 'feet', 'teeth', 
-            'mice', 'geese', 'oxen', 'data', 'criteria'
-        }
-        if text_lower in irregular_plurals:
-            return True
-        
-        return False
-
     def _is_third_person_singular_verb(self, verb_token):
         """Check if verb is third person singular form."""
         verb_text = verb_token.text.lower()
         base_verb = verb_token.lemma_
         
         # Check using lemminflect
-        third_person_forms = lemminflect.getInflection(base_verb, 'VBZ')
+        third_person_forms = get_inflection(base_verb, 'VBZ')
         if third_person_forms and verb_text == third_person_forms[0].lower():
             return True
             
@@ -197,9 +126,9 @@ class SubjectVerbAgreementDetector:
         """Get correct verb form for present simple."""
         base_verb = verb_token.lemma_
         
-        if self._is_third_person_singular(subject):
+        if agreement(subject.doc).is_third_person_singular(subject):
             # Get third person singular form
-            inflected = lemminflect.getInflection(base_verb, 'VBZ')
+            inflected = get_inflection(base_verb, 'VBZ')
             return inflected[0] if inflected else base_verb + 's'
         else:
             # Return base form for plural subjects
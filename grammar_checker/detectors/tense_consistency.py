@@ -1,39 +1,44 @@
-from grammar_checker.knowledge import LinguisticKnowledge
-import lemminflect
-import spacy
-
+from collections.abc import Mapping
+from grammar_checker.knowledge import get_knowledge
+from grammar_checker.detectors.registry import register_detector
+from grammar_checker.markers import find_markers
+from grammar_checker.inflection import get_inflection
+from grammar_checker.agreement import agreement
+from grammar_checker.token_index import token_index
+
+@register_detector
 class TenseConsistencyDetector:
+    name = "tense"
+    requires = frozenset({"doc", "tokens", "markers", "agreement"})
+    default = True
+    priority = 60
+
     def __init__(self):
-        self.knowledge = LinguisticKnowledge()
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            self.nlp = None
+        self.knowledge = get_knowledge()
 
     def detect(self, sentence_or_context):
         """Comprehensive tense consistency detection with improved logic."""
-        if isinstance(sentence_or_context, dict):
+        if isinstance(sentence_or_context, Mapping):
             doc = sentence_or_context.get('doc')
             tokens = sentence_or_context.get('tokens', [])
             if doc is None:
                 return []
-            return self._analyze_tense_consistency(doc, tokens)
+            markers = sentence_or_context.get('markers')
+            return self._analyze_tense_consistency(doc, tokens, markers)
         return []
 
-    def _analyze_tense_consistency(self, doc, tokens):
+    def _analyze_tense_consistency(self, doc, tokens, markers=None):
         """Analyze tense consistency and return detected tense errors."""
         if not tokens:
             return []
 
-        if tokens and isinstance(tokens[0], str):
-            sentence_text = doc.text if hasattr(doc, 'text') else ' '.join(tokens)
-            if self.nlp:
-                doc = self.nlp(sentence_text)
-                tokens = list(doc)
-            else:
-                tokens = self._create_simple_tokens(tokens)
-        
-        detected_tense = self._detect_sentence_tense(doc, tokens)
+        # Work on the Doc the context analyzer already parsed rather than
+        # running the pipeline again on the same text.
+        tokens = list(doc)
+        if markers is None:
+            markers = find_markers([token.lower_ for token in doc])
+
+        detected_tense = self._detect_sentence_tense(doc, tokens, markers)
 
         tense_errors = self._detect_tense_errors(doc, detected_tense, tokens)
         sva_errors = self._detect_sva_errors(doc, detected_tense)
@@ -47,100 +52,68 @@ class TenseConsistencyDetector:
         
         return [tense_info] + tense_errors + sva_errors
 
-    def _create_simple_tokens(self, token_strings):
-        """Create simple token-like objects from strings."""
-        class SimpleToken:
-            def __init__(self, text, index=0):
-                self.text = text
-                self.lower_ = text.lower()
-                self.pos_ = self._guess_pos(text)
-                self.lemma_ = text.lower()  # Simple lemma
-                self.idx = index
-                self.i = index
-                
-            def _guess_pos(self, text):
-                """Simple POS guessing based on common patterns."""
-                text_lower = text.lower()
-                
-                if text_lower in ['is', 'am', 'are', 'was', 'were', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'shall', 'would', 'could', 'should', 'may', 'might', 'must']:
-                    return 'AUX'
-                
-                if text_lower in ['go', 'come', 'see', 'look', 'make', 'take', 'give', 'get', 'say', 'know', 'think', 'feel', 'want', 'need', 'like', 'love', 'hate', 'work', 'play', 'read', 'write', 'run', 'walk', 'talk', 'speak', 'listen', 'eat', 'drink', 'sleep', 'live', 'study', 'learn']:
-                    return 'VERB'
-
-                if text_lower in ['i', 'you', 'he', 'she', 'it', 'we', 'they', 'this', 'that', 'these', 'those']:
-                    return 'PRON'
-                
-                return 'NOUN'
-        
-        return [SimpleToken(token, i) for i, token in enumerate(token_strings)]
-
-    def _detect_sentence_tense(self, doc, tokens):
+    def _detect_sentence_tense(self, doc, tokens, markers):
         """Detect the tense of the sentence with robust logic."""
-        sentence_text = doc.text if hasattr(doc, 'text') else ' '.join([t.text for t in tokens])
+        words = {token.text.lower() for token in tokens}
 
-        if self._has_tense_conflict(sentence_text):
-            return self._resolve_tense_conflict(sentence_text)
+        if self._has_tense_conflict(words, markers):
+            return self._resolve_tense_conflict(markers)
 
-        tense_from_markers = self._get_tense_from_time_markers_comprehensive(sentence_text)
+        tense_from_markers = self._get_tense_from_time_markers_comprehensive(markers)
         if tense_from_markers:
             return tense_from_markers
 
-        tense_from_aux = self._get_tense_from_auxiliaries_comprehensive(tokens)
+        index = token_index(doc)
+        tense_from_aux = self._get_tense_from_auxiliaries_comprehensive(index)
         if tense_from_aux:
             return tense_from_aux
 
-        tense_from_verbs = self._get_tense_from_verb_patterns_comprehensive(tokens)
+        tense_from_verbs = self._get_tense_from_verb_patterns_comprehensive(index)
         if tense_from_verbs:
             return tense_from_verbs
         
         return "simple_present"
 
-    def _has_tense_conflict(self, sentence_text):
+    def _has_tense_conflict(self, words, markers):
         """Check if there's a conflict between tense markers and verb forms."""
-        sentence_lower = sentence_text.lower()
-
-        if ('will' in sentence_lower or "'ll" in sentence_lower) and any(marker in sentence_lower for marker in self.knowledge.PAST_TENSE_MARKERS):
+        if ('will' in words or "'ll" in words) and markers.has('past'):
             return True
  
-        if any(aux in sentence_lower for aux in ['was', 'were', 'had']) and any(marker in sentence_lower for marker in self.knowledge.FUTURE_TENSE_MARKERS):
+        if any(aux in words for aux in ['was', 'were', 'had']) and markers.has('future'):
             return True
         
         return False
 
-    def _resolve_tense_conflict(self, sentence_text):
+    def _resolve_tense_conflict(self, markers):
         """Resolve tense conflicts - time markers usually win over verb forms."""
-        sentence_lower = sentence_text.lower()
-
-        if any(marker in sentence_lower for marker in self.knowledge.PAST_TENSE_MARKERS):
+        if markers.has('past'):
             return "simple_past"
 
-        if any(marker in sentence_lower for marker in self.knowledge.FUTURE_TENSE_MARKERS):
+        if markers.has('future'):
             return "simple_future"
         
         return "simple_present"
 
-    def _get_tense_from_time_markers_comprehensive(self, sentence_text):
+    def _get_tense_from_time_markers_comprehensive(self, markers):
         """Get tense from comprehensive time markers in knowledge base."""
-        sentence_lower = sentence_text.lower()
-        
         # Check past markers
-        if any(marker in sentence_lower for marker in self.knowledge.PAST_TENSE_MARKERS):
+        if markers.has('past'):
             return "simple_past"
         
         # Check future markers  
-        if any(marker in sentence_lower for marker in self.knowledge.FUTURE_TENSE_MARKERS):
+        if markers.has('future'):
             return "simple_future"
         
         # Check present markers
-        if any(marker in sentence_lower for marker in self.knowledge.PRESENT_TENSE_MARKERS):
+        if markers.has('present'):
             return "simple_present"
         
         return None
 
-    def _get_tense_from_auxiliaries_comprehensive(self, tokens):
+    def _get_tense_from_auxiliaries_comprehensive(self, index):
         """Comprehensive auxiliary verb tense detection."""
-        auxiliaries = [token for token in tokens if hasattr(token, 'pos_') and token.pos_ == 'AUX']
+        auxiliaries = index.pos('AUX')
+        verbs = index.pos('VERB')
         
         # Check for future tense (will/shall)
         if any(token.text.lower() in ['will', 'shall', "'ll"] for token in auxiliaries):
@@ -151,9 +124,8 @@ class TenseConsistencyDetector:
         for aux in have_auxiliaries:
             aux_text = aux.text.lower()
             # Look for past participle in nearby tokens
-            for token in tokens:
-                if (hasattr(token, 'pos_') and token.pos_ == 'VERB' and 
-                    self._is_past_participle_form(token.text.lower(), token)):
+            for token in verbs:
+                if self._is_past_participle_form(token.text.lower(), token):
                     if aux_text in ['has', 'have']:
                         return "present_perfect"
                     elif aux_text == 'had':
@@ -164,9 +136,8 @@ class TenseConsistencyDetector:
         for aux in be_auxiliaries:
             aux_text = aux.text.lower()
             # Look for -ing form in nearby tokens
-            for token in tokens:
-                if (hasattr(token, 'pos_') and token.pos_ == 'VERB' and 
-                    token.text.lower().endswith('ing')):
+            for token in verbs:
+                if token.text.lower().endswith('ing'):
                     if aux_text in ['am', 'is', 'are']:
                         return "present_continuous"
                     elif aux_text in ['was', 'were']:
@@ -182,9 +153,9 @@ class TenseConsistencyDetector:
         
         return None
 
-    def _get_tense_from_verb_patterns_comprehensive(self, tokens):
+    def _get_tense_from_verb_patterns_comprehensive(self, index):
         """Infer tense from main verb forms with comprehensive analysis."""
-        main_verbs = [token for token in tokens if self._is_main_verb(token)]
+        main_verbs = [token for token in index.pos('VERB') if self._is_main_verb(token)]
         if not main_verbs:
             return "simple_present"
         
@@ -223,7 +194,7 @@ class TenseConsistencyDetector:
         # we need to re-check the main verbs after those changes
         has_auxiliary_changes = any(error['suggestion']['type'] == 'remove' for error in aux_errors)
         
-        for token in doc:
+        for token in token_index(doc).pos('VERB'):
             # print(f"DEBUG: Processing token: '{token.text}' (POS: {token.pos_})")
             
             if self._is_main_verb(token):
@@ -282,43 +253,42 @@ class TenseConsistencyDetector:
         
         # print(f"DEBUG: Checking auxiliary errors for tense: {sentence_tense}")
         
-        for token in doc:
-            if token.pos_ == 'AUX':
-                # print(f"DEBUG: Checking auxiliary: '{token.text}'")
-                
-                # Check for future auxiliary in past context
-                if token.text.lower() in ['will', 'shall', "'ll"] and sentence_tense == 'simple_past':
-                    # print(f"DEBUG: Found future auxiliary '{token.text}' in past context")
-                    if not self._is_auxiliary_in_correct_construction(token, doc, sentence_tense):
-                        errors.append({
-                            'type': 'auxiliary_error',
-                            'message': f"Remove future auxiliary '{token.text}' for past tense",
-                            'suggestion': {'type': 'remove', 'index': token.i, 'word': ''},
-                            'position': token.idx
-                        })
-                        # print(f"DEBUG: Added auxiliary error - remove '{token.text}'")
-                
-                # Check for past auxiliary in future context  
-                elif token.text.lower() in ['was', 'were', 'had'] and sentence_tense == 'simple_future':
-                    # print(f"DEBUG: Found past auxiliary '{token.text}' in future context")
+        for token in token_index(doc).pos('AUX'):
+            # print(f"DEBUG: Checking auxiliary: '{token.text}'")
+            
+            # Check for future auxiliary in past context
+            if token.text.lower() in ['will', 'shall', "'ll"] and sentence_tense == 'simple_past':
+                # print(f"DEBUG: Found future auxiliary '{token.text}' in past context")
+                if not self._is_auxiliary_in_correct_construction(token, doc, sentence_tense):
                     errors.append({
-                        'type': 'auxiliary_error', 
-                        'message': f"Remove past auxiliary '{token.text}' for future tense",
+                        'type': 'auxiliary_error',
+                        'message': f"Remove future auxiliary '{token.text}' for past tense",
+                        'suggestion': {'type': 'remove', 'index': token.i, 'word': ''},
+                        'position': token.idx
+                    })
+                    # print(f"DEBUG: Added auxiliary error - remove '{token.text}'")
+            
+            # Check for past auxiliary in future context  
+            elif token.text.lower() in ['was', 'were', 'had'] and sentence_tense == 'simple_future':
+                # print(f"DEBUG: Found past auxiliary '{token.text}' in future context")
+                errors.append({
+                    'type': 'auxiliary_error', 
+                    'message': f"Remove past auxiliary '{token.text}' for future tense",
+                    'suggestion': {'type': 'remove', 'index': token.i, 'word': ''},
+                    'position': token.idx
+                })
+            
+            # Check for present auxiliary in past context when not needed
+            elif token.text.lower() in ['am', 'is', 'are', 'has', 'have', 'do', 'does'] and sentence_tense == 'simple_past':
+                # print(f"DEBUG: Found present auxiliary '{token.text}' in past context")
+                # Only flag if this auxiliary is creating a tense conflict
+                if not self._is_auxiliary_in_correct_construction(token, doc, sentence_tense):
+                    errors.append({
+                        'type': 'auxiliary_error',
+                        'message': f"Remove present auxiliary '{token.text}' for past tense",
                         'suggestion': {'type': 'remove', 'index': token.i, 'word': ''},
                         'position': token.idx
                     })
-                
-                # Check for present auxiliary in past context when not needed
-                elif token.text.lower() in ['am', 'is', 'are', 'has', 'have', 'do', 'does'] and sentence_tense == 'simple_past':
-                    # print(f"DEBUG: Found present auxiliary '{token.text}' in past context")
-                    # Only flag if this auxiliary is creating a tense conflict
-                    if not self._is_auxiliary_in_correct_construction(token, doc):
-                        errors.append({
-                            'type': 'auxiliary_error',
-                            'message': f"Remove present auxiliary '{token.text}' for past tense",
-                            'suggestion': {'type': 'remove', 'index': token.i, 'word': ''},
-                            'position': token.idx
-                        })
         
         return errors
 
@@ -362,11 +332,7 @@ class TenseConsistencyDetector:
         conditional_markers = {'if', 'unless', 'provided', 'assuming', 'supposing'}
         
         # Look for conditional markers in the sentence
-        for token in doc:
-            if token.text.lower() in conditional_markers:
-                return True
-        
-        return False
+        return token_index(doc).has_word(*conditional_markers)
 
     def _detect_conditional_errors(self, doc, tokens):
         """Detect and correct errors in conditional sentences."""
@@ -375,7 +341,7 @@ class TenseConsistencyDetector:
         # Identify the type of conditional
         conditional_type = self._identify_conditional_type(doc)
         
-        for token in doc:
+        for token in token_index(doc).pos('VERB'):
             if self._is_main_verb(token):
                 # Skip verbs in correct auxiliary constructions
                 if self._is_in_auxiliary_construction(token, doc):
@@ -460,26 +426,18 @@ class TenseConsistencyDetector:
 
     def _is_in_if_clause(self, token, doc):
         """Check if verb is in the if-clause of a conditional."""
+        index = token_index(doc)
+
         # Find the "if" token
-        if_token = None
-        for t in doc:
-            if t.text.lower() == 'if':
-                if_token = t
-                break
-        
-        if not if_token:
+        if index.first('if') is None:
             return False
         
         # Check if there's a comma separating clauses
-        comma_token = None
-        for t in doc:
-            if t.text == ',':
-                comma_token = t
-                break
+        comma = index.first(',')
         
-        if comma_token:
+        if comma is not None:
             # If there's a comma, check if token is before the comma (if-clause)
-            return token.i < comma_token.i
+            return token.i < comma
         else:
             # If no comma, use heuristics - usually first clause is if-clause
             return token.i < len(doc) / 2
@@ -537,12 +495,8 @@ class TenseConsistencyDetector:
         time_conjunctions = {'when', 'while', 'as', 'before', 'after', 'until', 'since', 'once'}
         
         # Look for time conjunctions before this verb
-        for i in range(token.i):
-            prev_token = doc[i]
-            if prev_token.text.lower() in time_conjunctions:
-                return True
-        
-        return False
+        first = token_index(doc).first(*time_conjunctions)
+        return first is not None and first < token.i
 
     def _is_when_clause_with_present_meaning(self, token, doc, main_tense):
         """Check if 'when' clause should use present tense for general truths."""
@@ -617,9 +571,9 @@ class TenseConsistencyDetector:
         if sentence_tense != 'simple_present':
             return errors
             
-        for token in doc:
+        for token in token_index(doc).pos('VERB'):
             if self._is_main_verb(token) and not self._is_modal_or_be(token):
-                subject = self._find_subject(token)
+                subject = agreement(doc).subject(token)
                 if subject and not self._check_sva_agreement(subject, token):
                     correct_form = self._get_correct_sva_form(token, subject)
                     if correct_form and correct_form.lower() != token.text.lower():
@@ -701,57 +655,6 @@ class TenseConsistencyDetector:
         modals = {'can', 'could', 'may', 'might', 'shall', 'should', 'will', 'would', 'must'}
         return verb_token.lemma_ in modals or verb_token.lemma_ == 'be'
 
-    def _find_subject(self, verb_token):
-        """Find the subject of a verb."""
-        if hasattr(verb_token, 'children'):
-            for child in verb_token.children:
-                if hasattr(child, 'dep_') and child.dep_ in ["nsubj", "nsubjpass"]:
-                    return child
-        if hasattr(verb_token, 'head') and verb_token.head != verb_token:
-            if hasattr(verb_token.head, 'children'):
-                for child in verb_token.head.children:
-                    if hasattr(child, 'dep_') and child.dep_ in ["nsubj", "nsubjpass"]:
-                        return child
-        return None
-
-    def _is_third_person_singular(self, subject_token):
-        """Check if subject is third person singular."""
-        if not hasattr(subject_token, 'text'):
-            return False
-            
-        subject_text = subject_token.text.lower()
-        
-        if subject_text in {'he', 'she', 'it'}:
-            return True
-        if subject_text in {'i', 'you', 'we', 'they'}:
-            return False
-        
-        # Indefinite pronouns
-        indefinite_singular = {'everyone', 'everybody', 'everything', 'someone', 'somebody', 
-                              'something', 'anyone', 'anybody', 'anything', 'no one', 'nobody',
-                              'nothing', 'each', 'either', 'neither'}
-        if subject_text in indefinite_singular:
-            return True
-        
-        # Collective nouns and academic subjects
-        singular_nouns = {'team', 'group', 'family', 'mathematics', 'physics', 'economics'}
-        if subject_text in singular_nouns:
-            return True
-        
-        # Default for other nouns
-        return not self._is_plural_noun(subject_token)
-
-    def _is_plural_noun(self, noun_token):
-        """Check if noun is plural."""
-        if not hasattr(noun_token, 'text'):
-            return False
-            
-        text_lower = noun_token.text.lower()
-        if (text_lower.endswith('s') and not text_lower.endswith(('ss', 'us', 'is', 'as', 'os'))):
-            return True
-        irregular_plurals = {'children', 'men', 'women', 'people', 'feet', 'teeth', 'mice'}
-        return text_lower in irregular_plurals
-
     def _is_third_person_singular_verb(self, verb_token):
         """Check if verb is third person singular form."""
         if not hasattr(verb_token, 'text') or not hasattr(verb_token, 'lemma_'):
@@ -759,12 +662,12 @@ class TenseConsistencyDetector:
             
         verb_text = verb_token.text.lower()
         base_verb = verb_token.lemma_
-        forms = lemminflect.getInflection(base_verb, 'VBZ')
+        forms = get_inflection(base_verb, 'VBZ')
         return forms and verb_text == forms[0].lower()
 
     def _check_sva_agreement(self, subject, verb):
         """Check subject-verb agreement."""
-        if self._is_third_person_singular(subject):
+        if agreement(subject.doc).is_third_person_singular(subject):
             return self._is_third_person_singular_verb(verb)
         else:
             return not self._is_third_person_singular_verb(verb)
@@ -776,8 +679,8 @@ class TenseConsistencyDetector:
             
         base_verb = verb_token.lemma_
         
-        if self._is_third_person_singular(subject):
-            forms = lemminflect.getInflection(base_verb, 'VBZ')
+        if agreement(subject.doc).is_third_person_singular(subject):
+            forms = get_inflection(base_verb, 'VBZ')
             return forms[0] if forms else base_verb + 's'
         else:
             return base_verb
@@ -823,13 +726,13 @@ class TenseConsistencyDetector:
         """Get present tense form with SVA consideration."""
         # Check if this verb needs third person -s
         if self._needs_third_person_s(base_verb, index, tokens):
-            forms = lemminflect.getInflection(base_verb, 'VBZ')
+            forms = get_inflection(base_verb, 'VBZ')
             return forms[0] if forms else base_verb + 's'
         return base_verb
 
     def _get_past_form(self, base_verb):
         """Get past tense form."""
-        forms = lemminflect.getInflection(base_verb, 'VBD')
+        forms = get_inflection(base_verb, 'VBD')
         
         if forms:
             return forms[0]
@@ -842,12 +745,12 @@ class TenseConsistencyDetector:
 
     def _get_ing_form(self, base_verb):
         """Get -ing form."""
-        forms = lemminflect.getInflection(base_verb, 'VBG')
+        forms = get_inflection(base_verb, 'VBG')
         return forms[0] if forms else base_verb + 'ing'
 
     def _get_past_participle_form(self, base_verb):
         """Get past participle form."""
-        forms = lemminflect.getInflection(base_verb, 'VBN')
+        forms = get_inflection(base_verb, 'VBN')
         return forms[0] if forms else base_verb + 'ed'
 
     def _needs_third_person_s(self, base_verb, index, tokens):
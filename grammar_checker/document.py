@@ -0,0 +1,123 @@
+import io
+import re
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Sentences without terminal punctuation are cut at whitespace past this length
+# so a single runaway "sentence" cannot grow the buffer without bound.
+MAX_SENTENCE_LENGTH = 5000
+
+# End of a sentence: terminal punctuation and any closing quotes or brackets
+# followed by whitespace, or a blank line.
+_BOUNDARY_RE = re.compile(r'[.!?]+["\'”’)\]]*\s+|\n[ \t]*\n\s*')
+_BLANK_LINE_RE = re.compile(r'\n[ \t]*\n')
+
+# Abbreviations that practically never end a sentence, so a period after
+# them is not a boundary even when a capital follows ("Dr. Smith").
+NON_TERMINAL_ABBREVIATIONS = frozenset({
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'st', 'sr', 'gen', 'capt', 'lt', 'col',
+    'sgt', 'rev', 'hon', 'fig', 'figs', 'vs', 'e.g', 'i.e', 'cf', 'approx',
+})
+
+def iter_sentences(source, chunk_size=DEFAULT_CHUNK_SIZE, max_sentence_length=MAX_SENTENCE_LENGTH):
+    """Yield (start, end, text) for each sentence of a string or text stream.
+
+    ``start`` and ``end`` are absolute character offsets into the whole input.
+    Streams are read ``chunk_size`` characters at a time and only the current
+    unfinished sentence is kept in memory.
+    """
+    if isinstance(source, str):
+        source = io.StringIO(source)
+
+    buffer = ''
+    buffer_start = 0
+
+    while True:
+        chunk = source.read(chunk_size)
+        at_eof = not chunk
+        buffer += chunk
+
+        pos = 0
+        for match in _BOUNDARY_RE.finditer(buffer):
+            # A boundary touching the end of the buffer may still grow
+            # (more whitespace or quotes in the next chunk).
+            if match.end() == len(buffer) and not at_eof:
+                break
+            if not _is_boundary(buffer, match):
+                continue
+            yield from _emit(buffer, buffer_start, pos, match.end())
+            pos = match.end()
+
+        while len(buffer) - pos > max_sentence_length:
+            cut = buffer.rfind(' ', pos, pos + max_sentence_length)
+            if cut <= pos:
+                cut = pos + max_sentence_length
+            yield from _emit(buffer, buffer_start, pos, cut)
+            pos = cut
+
+        buffer = buffer[pos:]
+        buffer_start += pos
+
+        if at_eof:
+            yield from _emit(buffer, buffer_start, 0, len(buffer))
+            return
+
+def _is_boundary(buffer, match):
+    """False when a lone period ends an abbreviation or initial, not a sentence."""
+    text = match.group()
+    if not text.startswith('.') or len(text.rstrip()) != 1 or _BLANK_LINE_RE.search(text):
+        return True
+
+    # "at 5 p.m. today", "approx. 20 people": the sentence carries on
+    following = buffer[match.end():match.end() + 1]
+    if following and (following.islower() or following.isdigit()):
+        return False
+
+    word_start = max(buffer.rfind(' ', 0, match.start()), buffer.rfind('\n', 0, match.start())) + 1
+    word = buffer[word_start:match.start()].lstrip('"\'“‘([')
+    if word.lower() in NON_TERMINAL_ABBREVIATIONS:
+        return False
+    # Initials such as "J. Smith" (but not the pronoun "I")
+    if len(word) == 1 and word.isupper() and word != 'I':
+        return False
+    return True
+
+def _emit(buffer, buffer_start, start, end):
+    """Yield the stripped sentence in buffer[start:end], if any."""
+    text = buffer[start:end]
+    stripped = text.strip()
+    if stripped:
+        lead = len(text) - len(text.lstrip())
+        begin = buffer_start + start + lead
+        yield begin, begin + len(stripped), stripped
+
+def token_offsets(text, tokens):
+    """Character offset of each token in ``text``, found left to right."""
+    offsets = []
+    pos = 0
+    for token in tokens:
+        found = text.find(token, pos)
+        if found < 0:
+            found = pos
+        offsets.append(found)
+        pos = found + len(token)
+    return offsets
+
+def add_error_offsets(result, text, start=0):
+    """Attach absolute 'offset' and 'length' to every error with a suggestion."""
+    tokens = result.get('original_tokens', [])
+    offsets = token_offsets(text, tokens)
+
+    for error in result.get('errors', []):
+        suggestion = error.get('suggestion')
+        if not suggestion:
+            continue
+        index = suggestion.get('index', 0)
+        if 0 <= index < len(tokens):
+            error['offset'] = start + offsets[index]
+            error['length'] = 0 if suggestion.get('type') == 'insert' else len(tokens[index])
+        else:
+            error['offset'] = start + len(text)
+            error['length'] = 0
+
+    return result
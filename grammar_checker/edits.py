@@ -0,0 +1,86 @@
+from collections import namedtuple
+
+# A suggestion as a span of original token positions: replace and remove
+# cover [index, index + 1), insert is the empty span at index.
+Edit = namedtuple("Edit", ["start", "end", "word", "error"])
+
+def to_edit(error, n_tokens):
+    """Turn an error's suggestion into an Edit, or None if it cannot apply."""
+    suggestion = error.get('suggestion')
+    if not suggestion:
+        return None
+    typ = suggestion.get('type')
+    index = suggestion.get('index', 0)
+
+    if typ == 'replace' and 0 <= index < n_tokens:
+        return Edit(index, index + 1, suggestion.get('word'), error)
+    if typ == 'remove' and 0 <= index < n_tokens:
+        return Edit(index, index + 1, None, error)
+    if typ == 'insert' and 0 <= index <= n_tokens and suggestion.get('word'):
+        return Edit(index, index, suggestion.get('word'), error)
+    return None
+
+def _conflicts(edit, other):
+    if edit.start == edit.end or other.start == other.end:
+        # Two inserts in the same gap; an insert never conflicts with a token edit
+        return edit.start == edit.end == other.start == other.end
+    return edit.start < other.end and other.start < edit.end
+
+def resolve_edits(errors, n_tokens, priority=None):
+    """Pick a non-overlapping set of edits from the errors' suggestions.
+
+    Edits are considered in order of ``priority(error)`` (lower wins), then
+    in the order the errors were reported. An edit that overlaps one already
+    accepted is dropped, except that an exact duplicate is merged silently.
+    Returns (accepted edits, dropped errors).
+    """
+    candidates = []
+    dropped = []
+    for order, error in enumerate(errors):
+        if not error.get('suggestion'):
+            continue
+        edit = to_edit(error, n_tokens)
+        if edit is None:
+            dropped.append(error)
+            continue
+        rank = priority(error) if priority is not None else 0
+        candidates.append((rank, order, edit))
+    candidates.sort(key=lambda item: (item[0], item[1]))
+
+    accepted = []
+    # Edits span at most one token, so only edits starting at the same
+    # position can overlap.
+    by_start = {}
+    for _, _, edit in candidates:
+        clash = [other for other in by_start.get(edit.start, ()) if _conflicts(edit, other)]
+        if clash:
+            if not any(other[:3] == edit[:3] for other in clash):
+                dropped.append(edit.error)
+            continue
+        accepted.append(edit)
+        by_start.setdefault(edit.start, []).append(edit)
+
+    return accepted, dropped
+
+def apply_edits(tokens, edits):
+    """Build the edited token list in one pass over non-overlapping edits."""
+    inserts = {}
+    changes = {}
+    for edit in edits:
+        if edit.start == edit.end:
+            inserts[edit.start] = edit.word
+        else:
+            changes[edit.start] = edit.word
+
+    out = []
+    for i, token in enumerate(tokens):
+        if i in inserts:
+            out.append(inserts[i])
+        if i in changes:
+            if changes[i] is not None:
+                out.append(changes[i])
+        else:
+            out.append(token)
+    if len(tokens) in inserts:
+        out.append(inserts[len(tokens)])
+    return out
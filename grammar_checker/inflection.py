@@ -0,0 +1,22 @@
+from functools import lru_cache
+
+INFLECTION_CACHE_SIZE = 16384
+
+@lru_cache(maxsize=INFLECTION_CACHE_SIZE)
+def get_inflection(lemma, tag):
+    """Inflect ``lemma`` to the Penn ``tag`` (e.g. 'VBZ', 'VBD').
+
+    Wraps lemminflect.getInflection with a bounded LRU keyed by (lemma, tag)
+    and returns a tuple so cached results cannot be mutated by callers.
+    lemminflect (which pulls in spaCy) is imported on the first miss.
+    """
+    from lemminflect import getInflection
+    return tuple(getInflection(lemma, tag))
+
+def inflection_cache_info():
+    """Hit/miss counters of the inflection cache."""
+    return get_inflection.cache_info()
+
+def clear_inflection_cache():
+    """Empty the inflection cache and reset its counters."""
+    get_inflection.cache_clear()
@@ -0,0 +1,205 @@
+from contextlib import contextmanager, nullcontext
+import bisect
+import json
+import os
+import threading
+import time
+
+# Latency buckets in seconds (upper bounds), Prometheus style.
+DEFAULT_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+class Histogram:
+    """Cumulative-bucket latency histogram."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Approximate quantile: upper bound of the bucket holding rank q."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+    def cumulative(self):
+        """(upper bound, cumulative count) pairs including +Inf."""
+        total = 0
+        pairs = []
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+class RequestMetrics:
+    """Timings and counters for a single check request."""
+
+    __slots__ = ("timings", "counters", "_cache_start", "_probes")
+
+    def __init__(self, probes):
+        self.timings = {}
+        self.counters = {}
+        self._probes = probes
+        self._cache_start = {name: probe() for name, probe in probes.items()}
+
+    @contextmanager
+    def time(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[stage] = self.timings.get(stage, 0.0) + time.perf_counter() - start
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def finish(self):
+        """Fold cache hit/miss deltas into the counters and return a plain dict."""
+        for name, probe in self._probes.items():
+            info = probe()
+            before = self._cache_start[name]
+            self.count(f"{name}_cache_hits", info.hits - before.hits)
+            self.count(f"{name}_cache_misses", info.misses - before.misses)
+        return {"timings": dict(self.timings), "counters": dict(self.counters)}
+
+class _NullMetrics:
+    """Stand-in used when instrumentation is off; every call is a no-op."""
+
+    __slots__ = ()
+    _context = nullcontext()
+
+    def time(self, stage):
+        return self._context
+
+    def count(self, name, value=1):
+        pass
+
+NULL_METRICS = _NullMetrics()
+
+class Instrumentation:
+    """Opt-in per-request instrumentation for GrammarChecker.
+
+    Records wall time per stage (parse, each detector, suggestions) and
+    counters (errors, parse invocations, cache hits/misses), and hands each
+    finished request to ``sink.record``. Cache counters are deltas of
+    process-wide caches, so with concurrent requests they are approximate.
+    """
+
+    def __init__(self, sink=None):
+        self.sink = sink if sink is not None else MemorySink()
+        self._probes = {}
+
+    def register_cache(self, name, cache_info):
+        """Track hits/misses of a cache exposing an lru_cache-style ``cache_info()``."""
+        self._probes[name] = cache_info
+
+    def start(self):
+        return RequestMetrics(self._probes)
+
+    def finish(self, metrics):
+        self.sink.record(metrics.finish())
+
+class MemorySink:
+    """Keeps histograms per stage and running counter totals in memory."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.histograms = {}
+        self.counters = {}
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def record(self, record):
+        with self._lock:
+            self.requests += 1
+            for stage, seconds in record["timings"].items():
+                if stage not in self.histograms:
+                    self.histograms[stage] = Histogram(self.buckets)
+                self.histograms[stage].observe(seconds)
+            for name, value in record["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self):
+        """Per-stage count/mean/p50/p95/p99 (seconds) plus counter totals."""
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": hist.count,
+                    "mean": hist.sum / hist.count if hist.count else 0.0,
+                    "p50": hist.quantile(0.50),
+                    "p95": hist.quantile(0.95),
+                    "p99": hist.quantile(0.99),
+                }
+                for stage, hist in self.histograms.items()
+            }
+            return {"requests": self.requests, "stages": stages, "counters": dict(self.counters)}
+
+class JsonLinesSink:
+    """Appends one JSON object per request to a file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def record(self, record):
+        line = json.dumps(dict(record, ts=time.time()))
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+class PrometheusSink(MemorySink):
+    """Aggregates like MemorySink and writes Prometheus text exposition to a file.
+
+    The file is rewritten atomically at most every ``interval`` seconds, and on
+    ``flush()``, so it can be picked up by node_exporter's textfile collector.
+    """
+
+    def __init__(self, path, interval=10.0, prefix="grammar_checker", buckets=DEFAULT_BUCKETS):
+        super().__init__(buckets)
+        self.path = path
+        self.interval = interval
+        self.prefix = prefix
+        self._last_write = 0.0
+
+    def record(self, record):
+        super().record(record)
+        if time.monotonic() - self._last_write >= self.interval:
+            self.flush()
+
+    def flush(self):
+        text = self.render()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, self.path)
+        self._last_write = time.monotonic()
+
+    def render(self):
+        with self._lock:
+            name = f"{self.prefix}_stage_seconds"
+            lines = [f"# HELP {name} Wall time per check stage.", f"# TYPE {name} histogram"]
+            for stage, hist in sorted(self.histograms.items()):
+                for bound, total in hist.cumulative():
+                    le = "+Inf" if bound == float('inf') else repr(bound)
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {total}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {hist.sum}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {hist.count}')
+
+            lines.append(f"# TYPE {self.prefix}_requests_total counter")
+            lines.append(f"{self.prefix}_requests_total {self.requests}")
+            for counter, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE {self.prefix}_{counter}_total counter")
+                lines.append(f"{self.prefix}_{counter}_total {value}")
+            return "\n".join(lines) + "\n"
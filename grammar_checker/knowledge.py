@@ -1,82 +1,165 @@
-from dataclasses import dataclass, field
-from nltk.corpus import wordnet as wn
-import lemminflect
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping
+import hashlib
+import json
+import os
+
+MASS_NOUNS_PATH = os.path.join(os.path.dirname(__file__), "data", "mass_nouns.txt")
+
+# Suffix rules WordNet's morphy applies to nouns, so plural forms still hit
+# the lexicon without a WordNet lookup.
+NOUN_SUFFIX_RULES = (
+    ('s', ''), ('ses', 's'), ('xes', 'x'), ('zes', 'z'),
+    ('ches', 'ch'), ('shes', 'sh'), ('men', 'man'), ('ies', 'y'),
+)
+
+def build_mass_noun_lexicon(path=MASS_NOUNS_PATH):
+    """Build the WordNet mass-noun table and write it to ``path``.
+
+    A noun counts as a mass noun when one of its synsets has a lemma whose
+    name contains 'mass', which is the test should_have_zero_article used to
+    run against WordNet on every call.
+    """
+    from nltk.corpus import wordnet as wn
+
+    nouns = set()
+    for synset in wn.all_synsets(pos=wn.NOUN):
+        names = [lemma.name().lower() for lemma in synset.lemmas()]
+        if any('mass' in name for name in names):
+            nouns.update(name.replace('_', ' ') for name in names)
+
+    # Write to a per-process temp file and rename it into place, so workers
+    # starting together never read a half-written table.
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(sorted(nouns)) + '\n')
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Warning: could not write mass-noun lexicon to {path}: {e}")
+
+    return frozenset(nouns)
+
+@lru_cache(maxsize=None)
+def load_mass_nouns(path=MASS_NOUNS_PATH):
+    """Load the mass-noun lexicon, building it from WordNet if it is missing."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return frozenset(line.strip() for line in f if line.strip())
+    except OSError:
+        pass
+
+    print(f"Warning: mass-noun lexicon not found at {path}; building it from WordNet now "
+          "(slow, one time). Run install_dependencies.py to build it ahead of time.")
+    try:
+        return build_mass_noun_lexicon(path)
+    except LookupError:
+        print("Warning: WordNet corpus not available, mass-noun lexicon is empty")
+        return frozenset()
+
+@lru_cache(maxsize=8192)
+def is_mass_noun(noun):
+    """Check a lowercase noun (or its singular form) against the mass-noun lexicon."""
+    mass_nouns = load_mass_nouns()
+    if noun in mass_nouns:
+        return True
+    for suffix, replacement in NOUN_SUFFIX_RULES:
+        if noun.endswith(suffix) and noun[:-len(suffix)] + replacement in mass_nouns:
+            return True
+    return False
+
+def _freeze(value):
+    """Recursively turn dicts into read-only mappings and lists into tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
 
-@dataclass
+@dataclass(frozen=True)
 class LinguisticKnowledge:
     """Enhanced linguistic knowledge base using NLTK and custom rules."""
     
     # Enhanced tense markers
-    PAST_TENSE_MARKERS: set = field(default_factory=lambda: {
+    PAST_TENSE_MARKERS: frozenset = field(default_factory=lambda: frozenset({
         'yesterday', 'ago', 'last', 'previous', 'earlier', 'before', 'once', 
         'already', 'recently', 'formerly', 'last night', 'last week', 
         'last month', 'last year', 'days ago', 'weeks ago', 'months ago', 
         'years ago', 'previously', 'back then', 'in the past', 'formerly',
         'historically', 'once upon a time', 'in ancient times'
-    })
+    }))
 
-    PRESENT_TENSE_MARKERS: set = field(default_factory=lambda: {
+    PRESENT_TENSE_MARKERS: frozenset = field(default_factory=lambda: frozenset({
         'now', 'currently', 'today', 'nowadays', 'these days', 'at present', 
         'at the moment', 'right now', 'as we speak', 'this week', 'this month',
         'this year', 'always', 'usually', 'often', 'sometimes', 'never',
         'currently', 'presently', 'now and then', 'from time to time'
-    })
+    }))
 
-    FUTURE_TENSE_MARKERS: set = field(default_factory=lambda: {
+    FUTURE_TENSE_MARKERS: frozenset = field(default_factory=lambda: frozenset({
         'tomorrow', 'next', 'soon', 'later', 'eventually', 'shortly', 
         'in future', 'in a while', 'the day after tomorrow', 'next week', 
         'next month', 'next year', 'in a few days', 'coming', 'upcoming',
         'forthcoming', 'in the future', 'down the road', 'eventually'
-    })
+    }))
 
     # Conditional markers
-    CONDITIONAL_MARKERS: set = field(default_factory=lambda: {
+    CONDITIONAL_MARKERS: frozenset = field(default_factory=lambda: frozenset({
         'if', 'unless', 'provided', 'as long as', 'on condition that',
         'assuming', 'supposing', 'in case'
-    })
+    }))
 
     # Historical present indicators
-    HISTORICAL_PRESENT_MARKERS: set = field(default_factory=lambda: {
+    HISTORICAL_PRESENT_MARKERS: frozenset = field(default_factory=lambda: frozenset({
         'suddenly', 'then', 'now', 'immediately', 'all of a sudden',
         'without warning', 'just then'
-    })
+    }))
 
     # Universal truth indicators  
-    UNIVERSAL_TRUTH_MARKERS: set = field(default_factory=lambda: {
+    UNIVERSAL_TRUTH_MARKERS: frozenset = field(default_factory=lambda: frozenset({
         'always', 'never', 'every', 'all', 'each', 'any', 'whenever',
         'wherever', 'whoever', 'whatever'
-    })
+    }))
 
     # Collective nouns (usually take singular verbs)
-    COLLECTIVE_NOUNS: set = field(default_factory=lambda: {
+    COLLECTIVE_NOUNS: frozenset = field(default_factory=lambda: frozenset({
         'team', 'group', 'family', 'class', 'committee', 'staff', 'crew',
         'audience', 'board', 'government', 'company', 'organization',
         'jury', 'crowd', 'public', 'army', 'navy', 'faculty', 'orchestra',
         'band', 'gang', 'flock', 'herd', 'pack', 'swarm', 'school', 'pride'
-    })
+    }))
 
     # Academic subjects (usually take singular verbs)  
-    ACADEMIC_SUBJECTS: set = field(default_factory=lambda: {
+    ACADEMIC_SUBJECTS: frozenset = field(default_factory=lambda: frozenset({
         'mathematics', 'math', 'physics', 'economics', 'statistics',
         'linguistics', 'electronics', 'ethics', 'politics', 'acoustics',
         'aesthetics', 'athletics', 'gymnastics', 'measles', 'mumps',
         'news', 'series', 'species'
-    })
+    }))
 
     # Indefinite pronouns (singular)
-    INDEFINITE_SINGULAR: set = field(default_factory=lambda: {
+    INDEFINITE_SINGULAR: frozenset = field(default_factory=lambda: frozenset({
         'everyone', 'everybody', 'everything', 'someone', 'somebody',
         'something', 'anyone', 'anybody', 'anything', 'no one', 'nobody',
         'nothing', 'each', 'either', 'neither', 'one', 'another'
-    })
+    }))
 
     # Indefinite pronouns (plural)  
-    INDEFINITE_PLURAL: set = field(default_factory=lambda: {
+    INDEFINITE_PLURAL: frozenset = field(default_factory=lambda: frozenset({
         'both', 'few', 'many', 'several', 'others'
-    })
+    }))
+
+    # Plurals not formed with -s
+    IRREGULAR_PLURALS: frozenset = field(default_factory=lambda: frozenset({
+        'children', 'men', 'women', 'people', 'feet', 'teeth', 'mice',
+        'geese', 'oxen', 'data', 'criteria', 'phenomena', 'police'
+    }))
 
     # Irregular verb forms for better tense detection
-    IRREGULAR_PAST_VERBS: set = field(default_factory=lambda: {
+    IRREGULAR_PAST_VERBS: frozenset = field(default_factory=lambda: frozenset({
         'was', 'were', 'had', 'did', 'went', 'saw', 'came', 'told', 'said',
         'took', 'made', 'knew', 'thought', 'found', 'gave', 'got', 'stood',
         'understood', 'began', 'became', 'broke', 'brought', 'built', 'bought',
@@ -90,14 +173,14 @@ class LinguisticKnowledge:
         'slept', 'spoke', 'spent', 'stood', 'stole', 'stuck', 'struck',
         'swore', 'swept', 'swam', 'took', 'taught', 'tore', 'told', 'thought',
         'threw', 'understood', 'woke', 'wore', 'won', 'wrote'
-    })
+    }))
 
     def is_irregular_past_verb(self, word):
         """Check if word is an irregular past tense verb."""
         return word.lower() in self.IRREGULAR_PAST_VERBS
 
     # Zero article nouns
-    ZERO_ARTICLE_NOUNS: set = field(default_factory=lambda: {
+    ZERO_ARTICLE_NOUNS: frozenset = field(default_factory=lambda: frozenset({
         # Institutions & Places (when used for their primary purpose)
         'school', 'college', 'university', 'church', 'temple', 'mosque', 'hospital', 'prison', 'jail', 'court',
         'work', 'home', 'sea', 'bed', 'camp', 'class', 'town', 'city',
@@ -152,10 +235,10 @@ class LinguisticKnowledge:
     'beginning', 'ending', 'meeting', 'planning', 'building', 'cleaning', 'washing',
     'packing', 'unpacking', 'moving', 'decorating', 'parenting', 'aging', 'ageing', 'dying',
     'raining', 'snowing',
-    })
+    }))
 
     # Uncountable nouns
-    UNCOUNTABLE_NOUNS: set = field(default_factory=lambda: {
+    UNCOUNTABLE_NOUNS: frozenset = field(default_factory=lambda: frozenset({
         # Abstract Concepts & States
         'advice', 'information', 'knowledge', 'research', 'evidence', 'data', 'intelligence',
         'progress', 'feedback', 'education', 'employment', 'unemployment', 'poverty',
@@ -189,9 +272,9 @@ class LinguisticKnowledge:
         'weather', 'thunder', 'lightning', 'rain', 'snow', 'sleet', 'wind', 'fog', 'sunshine',
         'traffic', 'transportation', 'accommodation',
         'news', 'help', 'weight', 'strength', 'length', 'height', 'width', 'depth',
-    })
+    }))
 
-    CONFUSION_SETS: dict = field(default_factory=lambda: {
+    CONFUSION_SETS: Mapping = field(default_factory=lambda: _freeze({
         # Possessive vs contraction vs location
         'their': ['there', "they're"],
         'there': ['their', "they're"], 
@@ -315,9 +398,9 @@ class LinguisticKnowledge:
         # Current vs currant
         'current': ['currant'],
         'currant': ['current'],
-    })
+    }))
 
-    PREPOSITION_COLLOCATIONS: dict = field(default_factory=lambda: {
+    PREPOSITION_COLLOCATIONS: Mapping = field(default_factory=lambda: _freeze({
         'go': {'to': ['school', 'work', 'bed', 'church', 'hospital']},
         'arrive': {'at': ['station', 'airport'], 'in': ['city', 'country']},
         'look': {'at': ['picture'], 'for': ['keys'], 'after': ['children']},
@@ -327,17 +410,26 @@ class LinguisticKnowledge:
         'apologize': {'for': ['mistake'], 'to': ['person']},
         'believe': {'in': ['truth']},
         'agree': {'with': ['person'], 'to': ['plan']}
-    })
-
-    HELPING_VERB_ERRORS: dict = field(default_factory=lambda: {
+    }))
+
+    COMMON_MISS_SPELLINGS: Mapping = field(default_factory=lambda: _freeze({
+        'recieve': 'receive', 'beleive': 'believe', 'acheive': 'achieve',
+        'seperate': 'separate', 'definately': 'definitely', 'occured': 'occurred',
+        'untill': 'until', 'wich': 'which', 'becuase': 'because', 'tommorow': 'tomorrow',
+        'goverment': 'government', 'enviroment': 'environment', 'neccessary': 'necessary',
+        'accomodate': 'accommodate', 'begining': 'beginning', 'beautifull': 'beautiful',
+        'wierd': 'weird', 'freind': 'friend', 'truely': 'truly', 'alot': 'a lot',
+    }))
+
+    HELPING_VERB_ERRORS: Mapping = field(default_factory=lambda: _freeze({
         'could of': 'could have',
         'would of': 'would have', 
         'should of': 'should have',
         'might of': 'might have',
         'must of': 'must have'
-    })
+    }))
 
-    CONFUSION_CONTEXTS: dict = field(default_factory=lambda: {
+    CONFUSION_CONTEXTS: Mapping = field(default_factory=lambda: _freeze({
         'their': {'possession': True, 'requires_noun': True},
         'there': {'location': True, 'often_before_verb': True},
         "they're": {'contraction': True, 'requires_verb': True},
@@ -347,7 +439,7 @@ class LinguisticKnowledge:
         'effect': {'noun': True, 'result': True},
         'then': {'time': True, 'sequence': True},
         'than': {'comparison': True},
-    })
+    }))
 
     def get_confusion_context_rules(self, word):
         """Get context rules for confusion words."""
@@ -355,13 +447,14 @@ class LinguisticKnowledge:
     
     def detect_tense_from_markers(self, sentence):
         """Detect tense based on time markers."""
-        sentence_lower = sentence.lower()
+        from grammar_checker.markers import find_markers
+        markers = find_markers(sentence)
         
-        if any(marker in sentence_lower for marker in self.PAST_TENSE_MARKERS):
+        if markers.has("past"):
             return "past"
-        elif any(marker in sentence_lower for marker in self.FUTURE_TENSE_MARKERS):
+        elif markers.has("future"):
             return "future"
-        elif any(marker in sentence_lower for marker in self.PRESENT_TENSE_MARKERS):
+        elif markers.has("present"):
             return "present"
         return None
 
@@ -373,16 +466,8 @@ class LinguisticKnowledge:
             noun_lower in self.UNCOUNTABLE_NOUNS):
             return True
             
-        # Check WordNet for uncountable nouns
-        try:
-            synsets = wn.synsets(noun_lower, pos=wn.NOUN)
-            for synset in synsets:
-                if any('mass' in lemma.name().lower() for lemma in synset.lemmas()):
-                    return True
-        except:
-            pass
-            
-        return False
+        # Check the precomputed WordNet mass-noun lexicon
+        return is_mass_noun(noun_lower)
 
     def is_uncountable_noun(self, word):
         """Check if noun is uncountable."""
@@ -392,12 +477,40 @@ class LinguisticKnowledge:
         """Get confusion word alternatives."""
         return self.CONFUSION_SETS.get(word.lower(), [])
     
-    SILENT_H_WORDS: set = field(default_factory=lambda: {
+    SILENT_H_WORDS: frozenset = field(default_factory=lambda: frozenset({
         'honor', 'honest', 'hour', 'heir', 'honorable', 'honorary'
-    })
+    }))
 
-    Y_SOUND_WORDS: set = field(default_factory=lambda: {
+    Y_SOUND_WORDS: frozenset = field(default_factory=lambda: frozenset({
         'university', 'european', 'unique', 'one', 'once', 'user', 'ukulele'
-    })
-
-    ACRONYM_VOWEL_SOUNDS: set = field(default_factory=lambda: set("AEFHI" ))
+    }))
+
+    ACRONYM_VOWEL_SOUNDS: frozenset = field(default_factory=lambda: frozenset("AEFHI"))
+
+@lru_cache(maxsize=None)
+def get_knowledge():
+    """Return the process-wide LinguisticKnowledge instance.
+
+    The tables are immutable, so one instance is shared by every detector and,
+    when built before forking, by worker processes as well.
+    """
+    return LinguisticKnowledge()
+
+def _canonical(value):
+    if isinstance(value, (frozenset, set)):
+        return sorted(value)
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Cannot fingerprint {type(value).__name__}")
+
+@lru_cache(maxsize=None)
+def knowledge_fingerprint():
+    """Short stable hash of every knowledge base table.
+
+    Changes whenever a table is edited, so it can version anything derived
+    from the knowledge base, such as cached check results.
+    """
+    knowledge = get_knowledge()
+    tables = {f.name: getattr(knowledge, f.name) for f in fields(knowledge)}
+    text = json.dumps(tables, default=_canonical, sort_keys=True)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
\ No newline at end of file
@@ -0,0 +1,95 @@
+from collections import namedtuple
+from functools import lru_cache
+import re
+from grammar_checker.knowledge import get_knowledge
+
+MarkerHit = namedtuple("MarkerHit", ["start", "end", "marker", "category"])
+
+# Rough word tokenizer for callers that only have a plain string.
+_WORD_RE = re.compile(r"\w+(?:'\w+)?|[^\w\s]")
+
+_END = None
+
+class MarkerMatches:
+    """All marker hits found in one sentence."""
+
+    __slots__ = ("hits", "_by_category")
+
+    def __init__(self, hits):
+        self.hits = hits
+        self._by_category = {}
+        for hit in hits:
+            self._by_category.setdefault(hit.category, set()).add(hit.marker)
+
+    def has(self, category, markers=None):
+        """Check for a hit in ``category``, optionally limited to some marker phrases."""
+        found = self._by_category.get(category)
+        if not found:
+            return False
+        if markers is None:
+            return True
+        return not found.isdisjoint(markers)
+
+    def markers(self, category):
+        """Marker phrases matched for ``category``."""
+        return self._by_category.get(category, set())
+
+    def __bool__(self):
+        return bool(self.hits)
+
+    def __repr__(self):
+        return f"MarkerMatches({self.hits!r})"
+
+class MarkerMatcher:
+    """Word-level trie over multi-word marker phrases.
+
+    Matches whole lowercase tokens only, so 'now' does not fire inside 'know'
+    and 'last' does not fire inside 'lastly'.
+    """
+
+    def __init__(self, marker_sets):
+        self._trie = {}
+        for category, markers in marker_sets.items():
+            for marker in markers:
+                node = self._trie
+                for word in marker.split():
+                    node = node.setdefault(word, {})
+                node.setdefault(_END, []).append(category)
+
+    def find(self, words):
+        """Return every marker hit in a sequence of lowercase tokens, with token offsets."""
+        hits = []
+        for start in range(len(words)):
+            node = self._trie.get(words[start])
+            end = start
+            while node is not None:
+                end += 1
+                for category in node.get(_END, ()):
+                    hits.append(MarkerHit(start, end, ' '.join(words[start:end]), category))
+                if end >= len(words):
+                    break
+                node = node.get(words[end])
+        return MarkerMatches(hits)
+
+@lru_cache(maxsize=None)
+def get_marker_matcher():
+    """Return the shared matcher built from the knowledge base marker sets."""
+    knowledge = get_knowledge()
+    return MarkerMatcher({
+        "past": knowledge.PAST_TENSE_MARKERS,
+        "present": knowledge.PRESENT_TENSE_MARKERS,
+        "future": knowledge.FUTURE_TENSE_MARKERS,
+        "conditional": knowledge.CONDITIONAL_MARKERS,
+        "historical_present": knowledge.HISTORICAL_PRESENT_MARKERS,
+        "universal_truth": knowledge.UNIVERSAL_TRUTH_MARKERS,
+    })
+
+def tokenize(text):
+    """Lowercase word tokens for a plain string."""
+    return _WORD_RE.findall(text.lower())
+
+def find_markers(text_or_words):
+    """Match markers in a string or a list of lowercase tokens."""
+    if isinstance(text_or_words, str):
+        text_or_words = tokenize(text_or_words)
+    return get_marker_matcher().find(text_or_words)
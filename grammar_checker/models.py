@@ -0,0 +1,37 @@
+import threading
+
+DEFAULT_MODEL = "en_core_web_sm"
+
+# None of the detectors read named entities, so the shared pipeline skips NER.
+DEFAULT_EXCLUDE = ("ner",)
+
+_pipelines = {}
+_lock = threading.Lock()
+
+
+def get_nlp(name=DEFAULT_MODEL, exclude=DEFAULT_EXCLUDE):
+    """Return the shared spaCy pipeline for this process, loading it on first use.
+
+    Pipelines are cached per (name, excluded pipes), so every caller asking for
+    the same configuration gets the same object. Returns None if the model is
+    not installed.
+    """
+    key = (name, tuple(sorted(exclude)))
+    if key in _pipelines:
+        return _pipelines[key]
+
+    with _lock:
+        if key not in _pipelines:
+            try:
+                import spacy
+                _pipelines[key] = spacy.load(name, exclude=list(key[1]))
+            except Exception as e:
+                print(f"Warning: spaCy model not available: {e}")
+                _pipelines[key] = None
+        return _pipelines[key]
+
+
+def clear_pipelines():
+    """Drop all cached pipelines (mainly useful for tests)."""
+    with _lock:
+        _pipelines.clear()
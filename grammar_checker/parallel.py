@@ -0,0 +1,117 @@
+import gc
+import multiprocessing
+import os
+from collections import deque
+from itertools import islice
+from grammar_checker.core import GrammarChecker
+from grammar_checker.document import DEFAULT_CHUNK_SIZE, add_error_offsets, iter_sentences
+from grammar_checker.knowledge import load_mass_nouns
+from grammar_checker.markers import get_marker_matcher
+
+DEFAULT_CHUNK_SENTENCES = 64
+
+# Checker used inside worker processes. With the fork start method it is the
+# parent's instance, inherited copy-on-write; with spawn each worker builds one.
+_worker_checker = None
+
+def _init_worker(checker_options):
+    global _worker_checker
+    if _worker_checker is None:
+        _worker_checker = GrammarChecker(**checker_options)
+
+def _check_chunk(task):
+    sentences, detectors = task
+    return list(_worker_checker.check_many(sentences, batch_size=len(sentences), detectors=detectors))
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+class ParallelGrammarChecker:
+    """Runs GrammarChecker over a pool of worker processes.
+
+    The spaCy model, knowledge base and detectors are loaded once in the
+    parent and the pool is forked afterwards, so workers share those pages
+    copy-on-write instead of each loading its own copy. Sentences are sent
+    to the workers in chunks of ``chunk_size``; results come back in input
+    order, with at most ``max_pending`` chunks in flight at a time.
+    """
+
+    def __init__(self, processes=None, chunk_size=DEFAULT_CHUNK_SENTENCES, max_pending=None,
+                 detectors=None):
+        global _worker_checker
+
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending or 2 * self.processes
+        checker_options = {"detectors": detectors}
+
+        if "fork" in multiprocessing.get_all_start_methods():
+            _worker_checker = GrammarChecker(**checker_options)
+            # Load the model, the lazily built tables and every default
+            # detector now so workers inherit them instead of loading their own.
+            _worker_checker.context_analyzer.nlp
+            load_mass_nouns()
+            get_marker_matcher()
+            for name in _worker_checker.enabled:
+                _worker_checker.get_detector(name)
+            # Keep the garbage collector from touching (and so copying) the
+            # shared objects in every worker.
+            gc.freeze()
+            context = multiprocessing.get_context("fork")
+        else:
+            context = multiprocessing.get_context("spawn")
+
+        self._pool = context.Pool(self.processes, initializer=_init_worker, initargs=(checker_options,))
+        gc.unfreeze()
+
+    def check_many(self, sentences, detectors=None):
+        """Check an iterable of sentences, yielding results in input order."""
+        pending = deque()
+        for chunk in _chunks(sentences, self.chunk_size):
+            pending.append(self._pool.apply_async(_check_chunk, ((chunk, detectors),)))
+            if len(pending) >= self.max_pending:
+                yield from pending.popleft().get()
+
+        while pending:
+            yield from pending.popleft().get()
+
+    def iter_check(self, source, chunk_size=DEFAULT_CHUNK_SIZE, detectors=None):
+        """Check a whole document like GrammarChecker.iter_check, in parallel."""
+        spans = deque()
+
+        def texts():
+            for start, end, text in iter_sentences(source, chunk_size=chunk_size):
+                spans.append((start, end, text))
+                yield text
+
+        for result in self.check_many(texts(), detectors=detectors):
+            start, end, text = spans.popleft()
+            add_error_offsets(result, text, start)
+            result['start'] = start
+            result['end'] = end
+            result['text'] = text
+            yield result
+
+    def check_document(self, source, **kwargs):
+        """Check a whole document and return the list of per-sentence results."""
+        return list(self.iter_check(source, **kwargs))
+
+    def close(self):
+        """Stop the workers after they finish outstanding work."""
+        self._pool.close()
+        self._pool.join()
+
+    def terminate(self):
+        self._pool.terminate()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,146 @@
+import hashlib
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+# Pending docs are written out as a new segment once this many have been added.
+DEFAULT_FLUSH_EVERY = 1000
+# Decoded segments kept in memory for lookups.
+DEFAULT_CACHED_SEGMENTS = 4
+
+def _text_key(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def model_tag(nlp):
+    """Directory name identifying a pipeline: model name, version and active pipes."""
+    meta = nlp.meta
+    pipes = hashlib.sha256(",".join(nlp.pipe_names).encode("utf-8")).hexdigest()[:8]
+    return f"{meta.get('lang', 'xx')}_{meta.get('name', 'pipeline')}-{meta.get('version', '0')}-{pipes}"
+
+class ParseStore:
+    """On-disk store of parsed Docs, keyed by sentence text and model.
+
+    Docs are kept in append-only segments under ``directory/<model tag>/``:
+    a spaCy DocBin file plus a sidecar ``.keys`` file listing the text
+    hashes in DocBin order. New Docs are held in memory until
+    ``flush_every`` have been added (or ``flush()`` is called), then written
+    as one new segment, so existing files are never rewritten. Only the
+    key -> (segment, position) index stays in memory, along with the last
+    ``cached_segments`` segments read by lookups.
+    """
+
+    def __init__(self, directory, nlp, flush_every=DEFAULT_FLUSH_EVERY,
+                 cached_segments=DEFAULT_CACHED_SEGMENTS):
+        from spacy.tokens import DocBin
+
+        self._DocBin = DocBin
+        self.nlp = nlp
+        self.directory = os.path.join(directory, model_tag(nlp))
+        self.flush_every = flush_every
+        self.cached_segments = cached_segments
+        os.makedirs(self.directory, exist_ok=True)
+        self._index = {}
+        self._pending = {}
+        self._segments = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._load_index()
+
+    def get(self, text):
+        """Stored Doc for ``text``, or None."""
+        key = _text_key(text)
+        with self._lock:
+            doc = self._pending.get(key)
+            if doc is None:
+                location = self._index.get(key)
+                if location is not None:
+                    segment, position = location
+                    docs = self._load_segment(segment)
+                    if position < len(docs):
+                        doc = docs[position]
+            if doc is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return doc
+
+    def put(self, text, doc):
+        key = _text_key(text)
+        with self._lock:
+            if key in self._index or key in self._pending:
+                return
+            self._pending[key] = doc
+            if len(self._pending) >= self.flush_every:
+                self._flush()
+
+    def flush(self):
+        """Write pending Docs as a new segment."""
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        self.flush()
+        self._segments.clear()
+
+    def __len__(self):
+        return len(self._index) + len(self._pending)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _paths(self, segment):
+        base = os.path.join(self.directory, segment)
+        return base + ".spacy", base + ".keys"
+
+    def _load_index(self):
+        for name in sorted(os.listdir(self.directory)):
+            segment, ext = os.path.splitext(name)
+            if ext != ".keys":
+                continue
+            doc_path, keys_path = self._paths(segment)
+            # The keys file is written last, but check for its DocBin anyway
+            if not os.path.exists(doc_path):
+                continue
+            with open(keys_path, encoding="utf-8") as f:
+                for position, key in enumerate(f.read().split()):
+                    self._index.setdefault(key, (segment, position))
+
+    def _load_segment(self, segment):
+        docs = self._segments.get(segment)
+        if docs is not None:
+            self._segments.move_to_end(segment)
+            return docs
+
+        doc_path, _ = self._paths(segment)
+        docs = list(self._DocBin().from_disk(doc_path).get_docs(self.nlp.vocab))
+        self._segments[segment] = docs
+        while len(self._segments) > self.cached_segments:
+            self._segments.popitem(last=False)
+        return docs
+
+    def _flush(self):
+        if not self._pending:
+            return
+
+        # Unique across processes sharing the directory
+        segment = f"{os.getpid()}-{uuid.uuid4().hex[:12]}"
+        doc_bin = self._DocBin(docs=self._pending.values(), store_user_data=False)
+        doc_path, keys_path = self._paths(segment)
+        # DocBin first: a segment only becomes visible once its keys file exists
+        self._write(doc_path, doc_bin.to_bytes())
+        self._write(keys_path, ("\n".join(self._pending) + "\n").encode("utf-8"))
+
+        for position, key in enumerate(self._pending):
+            self._index[key] = (segment, position)
+        self._pending.clear()
+
+    def _write(self, path, data):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
@@ -0,0 +1,288 @@
+"""
+HTTP/JSON front-end for GrammarChecker.
+
+    python -m grammar_checker.service --port 8080
+
+POST /check        {"text": "...", "detectors": [...]}   -> result
+POST /check_batch  {"texts": [...], "detectors": [...]}  -> {"results": [...]}
+GET  /health                                            -> {"status": "ok", ...}
+
+One GrammarChecker is shared by all connections. Concurrent requests are
+collected for up to ``batch_window`` seconds (or ``max_batch_size`` texts)
+and parsed together with nlp.pipe on a single worker thread. When more than
+``max_in_flight`` texts are queued or being checked, new requests get 503.
+"""
+
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from grammar_checker.core import GrammarChecker
+from grammar_checker.detectors.registry import resolve_detectors
+from grammar_checker.knowledge import load_mass_nouns
+
+DEFAULT_BATCH_WINDOW = 0.005
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_IN_FLIGHT = 1024
+MAX_BODY_SIZE = 1024 * 1024
+
+class Overloaded(Exception):
+    """Raised when accepting a request would exceed the in-flight limit."""
+
+class _BadRequest(Exception):
+    """A request that cannot be read; answered, then the connection is closed."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class MicroBatcher:
+    """Coalesces concurrent check requests into check_many batches."""
+
+    def __init__(self, checker, batch_window=DEFAULT_BATCH_WINDOW,
+                 max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_in_flight=DEFAULT_MAX_IN_FLIGHT):
+        self.checker = checker
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self._queue = asyncio.Queue()
+        # spaCy pipelines and the detectors are not meant for concurrent use,
+        # so every batch runs on the same single worker thread.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="grammar-check")
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, texts, detectors=None):
+        """Check ``texts`` and return their results in order."""
+        if self.in_flight + len(texts) > self.max_in_flight:
+            raise Overloaded()
+
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in texts]
+        self.in_flight += len(texts)
+        try:
+            for text, future in zip(texts, futures):
+                self._queue.put_nowait((text, detectors, future))
+            return await asyncio.gather(*futures)
+        finally:
+            self.in_flight -= len(texts)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Requests may select different detectors; batch each selection separately.
+            groups = {}
+            for text, detectors, future in batch:
+                try:
+                    key = None if detectors is None else tuple(sorted(detectors))
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                    continue
+                groups.setdefault(key, []).append((text, future))
+
+            for detectors, items in groups.items():
+                texts = [text for text, _ in items]
+                try:
+                    results = await loop.run_in_executor(self._executor, self._check, texts, detectors)
+                except Exception:
+                    # Re-check one text at a time so only the failing request fails
+                    await self._check_each(items, detectors)
+                    continue
+                for (_, future), result in zip(items, results):
+                    if not future.done():
+                        future.set_result(result)
+
+    async def _check_each(self, items, detectors):
+        loop = asyncio.get_running_loop()
+        for text, future in items:
+            try:
+                results = await loop.run_in_executor(self._executor, self._check, [text], detectors)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            if not future.done():
+                future.set_result(results[0])
+
+    def _check(self, texts, detectors):
+        return list(self.checker.check_many(texts, batch_size=len(texts), detectors=detectors))
+
+class GrammarService:
+    """Minimal HTTP/1.1 server on asyncio streams."""
+
+    def __init__(self, checker=None, **batch_options):
+        self.checker = checker if checker is not None else GrammarChecker()
+        self.batch_options = batch_options
+        self.batcher = None
+
+    async def serve(self, host="127.0.0.1", port=8080):
+        # Load the model and build any missing tables before taking requests
+        self.checker.context_analyzer.nlp
+        load_mass_nouns()
+        self.batcher = MicroBatcher(self.checker, **self.batch_options)
+        self.batcher.start()
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        print(f"Grammar checker service listening on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.close()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except _BadRequest as e:
+                    # The body was not read, so the stream cannot be reused
+                    await self._write_response(writer, e.status, {"error": str(e)}, False)
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                try:
+                    status, payload = await self._dispatch(method, path, body)
+                except Exception as e:
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"Internal error: {e}"}
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, path, _ = line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            return None
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise _BadRequest(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if length > MAX_BODY_SIZE:
+            raise _BadRequest(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method, path, headers, body
+
+    async def _dispatch(self, method, path, body):
+        path = path.split("?", 1)[0]
+
+        if path == "/health" and method == "GET":
+            return HTTPStatus.OK, {"status": "ok", "in_flight": self.batcher.in_flight}
+
+        if path not in ("/check", "/check_batch"):
+            return HTTPStatus.NOT_FOUND, {"error": f"Unknown endpoint: {path}"}
+        if method != "POST":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Use POST"}
+
+        try:
+            data = json.loads(body or b"{}")
+            detectors = data.get("detectors")
+            if path == "/check":
+                texts = [data["text"]]
+            else:
+                texts = data["texts"]
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                raise TypeError("texts must be a list of strings")
+            if detectors is not None and (
+                not isinstance(detectors, list)
+                or not all(isinstance(name, str) for name in detectors)
+            ):
+                raise TypeError("detectors must be a list of strings")
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            return HTTPStatus.BAD_REQUEST, {"error": f"Invalid request: {e}"}
+
+        if detectors is not None:
+            try:
+                resolve_detectors(detectors)
+            except ValueError as e:
+                return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+
+        try:
+            results = await self.batcher.submit(texts, detectors)
+        except Overloaded:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Too many requests in flight"}
+        except Exception as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"Check failed: {e}"}
+
+        if path == "/check":
+            return HTTPStatus.OK, results[0]
+        return HTTPStatus.OK, {"results": results}
+
+    async def _write_response(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload, default=str).encode("utf-8")
+        head = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            head.append("Retry-After: 1")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve GrammarChecker over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--batch-window-ms", type=float, default=DEFAULT_BATCH_WINDOW * 1000)
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT)
+    args = parser.parse_args(argv)
+
+    service = GrammarService(
+        batch_window=args.batch_window_ms / 1000,
+        max_batch_size=args.max_batch_size,
+        max_in_flight=args.max_in_flight,
+    )
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+from bisect import bisect_left, bisect_right
+from grammar_checker.core import GrammarChecker
+from grammar_checker.document import add_error_offsets, iter_sentences
+
+class _Sentence:
+    __slots__ = ("start", "end", "text", "result")
+
+    def __init__(self, start, end, text, result):
+        self.start = start
+        self.end = end
+        self.text = text
+        # Error offsets in the result are relative to the sentence start
+        self.result = result
+
+def _diagnostics(sentence):
+    """Errors of a sentence with absolute offsets.
+
+    Errors without a suggestion have no position of their own and cover
+    the whole sentence.
+    """
+    found = []
+    for error in sentence.result.get('errors', []):
+        diagnostic = dict(error)
+        if 'offset' in error:
+            diagnostic['offset'] = sentence.start + error['offset']
+        else:
+            diagnostic['offset'] = sentence.start
+            diagnostic['length'] = len(sentence.text)
+        found.append(diagnostic)
+    return found
+
+def _identity(diagnostic):
+    return diagnostic['offset'], diagnostic['length'], diagnostic.get('message')
+
+class DocumentSession:
+    """A document kept checked across edits.
+
+    ``apply_edit`` replaces ``delete_length`` characters at ``offset`` with
+    new text, re-splits only the sentences around the edit and checks the
+    ones whose text changed. Sentences further away keep their results and
+    just have their offsets shifted, so the parsing cost of an edit does not
+    grow with the document.
+    """
+
+    def __init__(self, text="", checker=None, detectors=None):
+        self.checker = checker if checker is not None else GrammarChecker()
+        self.detectors = detectors
+        self._text = ""
+        self._sentences = []
+        if text:
+            self.apply_edit(0, 0, text)
+
+    @property
+    def text(self):
+        return self._text
+
+    def diagnostics(self):
+        """All current errors, with absolute 'offset' and 'length'."""
+        found = []
+        for sentence in self._sentences:
+            found.extend(_diagnostics(sentence))
+        return found
+
+    def results(self):
+        """Per-sentence results like GrammarChecker.iter_check produces."""
+        results = []
+        for sentence in self._sentences:
+            result = dict(sentence.result, start=sentence.start, end=sentence.end, text=sentence.text)
+            result['errors'] = _diagnostics(sentence)
+            results.append(result)
+        return results
+
+    def apply_edit(self, offset, delete_length, text):
+        """Apply an edit and return {'added': [...], 'removed': [...]}.
+
+        Removed diagnostics carry their offsets in the text before the edit,
+        added ones their offsets after it. Diagnostics that survive the edit
+        (possibly shifted) are in neither list.
+        """
+        if not 0 <= offset <= len(self._text) or delete_length < 0 \
+                or offset + delete_length > len(self._text):
+            raise ValueError(
+                f"Edit at {offset} deleting {delete_length} characters is outside the document"
+            )
+
+        old_end = offset + delete_length
+        shift = len(text) - delete_length
+        self._text = self._text[:offset] + text + self._text[old_end:]
+
+        # Sentences touching the edit, plus one neighbour on each side since
+        # an edit can move the boundary with either of them.
+        ends = [sentence.end for sentence in self._sentences]
+        starts = [sentence.start for sentence in self._sentences]
+        first = max(bisect_left(ends, offset) - 1, 0)
+        last = min(bisect_right(starts, old_end), len(self._sentences) - 1) + 1
+        replaced = self._sentences[first:last]
+
+        region_start = self._sentences[first - 1].end if first > 0 else 0
+        region_end = self._sentences[last].start + shift if last < len(self._sentences) else len(self._text)
+
+        for sentence in self._sentences[last:]:
+            sentence.start += shift
+            sentence.end += shift
+
+        new_sentences = self._resplit(region_start, region_end, replaced)
+        self._sentences[first:last] = new_sentences
+
+        def moved(diagnostic):
+            start = diagnostic['offset']
+            if start + diagnostic['length'] <= offset:
+                return diagnostic
+            if start >= old_end:
+                return dict(diagnostic, offset=start + shift)
+            return None
+
+        # The replaced sentences still have their pre-edit offsets
+        before = []
+        for sentence in replaced:
+            before.extend(_diagnostics(sentence))
+        after = []
+        for sentence in new_sentences:
+            after.extend(_diagnostics(sentence))
+
+        # Old diagnostics outside the edited span, by where they land after it
+        unmatched = {}
+        for diagnostic in before:
+            current = moved(diagnostic)
+            if current is not None:
+                unmatched.setdefault(_identity(current), []).append(diagnostic)
+
+        added = []
+        kept = set()
+        for diagnostic in after:
+            matches = unmatched.get(_identity(diagnostic))
+            if matches:
+                kept.add(id(matches.pop()))
+            else:
+                added.append(diagnostic)
+        removed = [diagnostic for diagnostic in before if id(diagnostic) not in kept]
+
+        return {'added': added, 'removed': removed}
+
+    def _resplit(self, region_start, region_end, replaced):
+        """Split the region into sentences, checking only those with new text."""
+        spans = list(iter_sentences(self._text[region_start:region_end]))
+        previous = {sentence.text: sentence.result for sentence in replaced}
+
+        to_check = list(dict.fromkeys(text for _, _, text in spans if text not in previous))
+        checked = dict(zip(to_check, self.checker.check_many(to_check, detectors=self.detectors)))
+
+        sentences = []
+        for start, end, text in spans:
+            result = previous.get(text)
+            if result is None:
+                result = add_error_offsets(checked[text], text)
+            sentences.append(_Sentence(region_start + start, region_start + end, text, result))
+        return sentences
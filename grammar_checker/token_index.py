@@ -0,0 +1,58 @@
+from collections import defaultdict
+
+TOKEN_INDEX_KEY = "token_index"
+
+class TokenIndex:
+    """Tokens of one Doc bucketed by POS, lowercase text and lemma.
+
+    Built in a single walk over the Doc so the detectors can visit only the
+    tokens their rules care about instead of each re-scanning the sentence.
+    Every bucket keeps document order.
+    """
+
+    __slots__ = ("doc", "by_pos", "by_lower", "by_lemma")
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.by_pos = defaultdict(list)
+        self.by_lower = defaultdict(list)
+        self.by_lemma = defaultdict(list)
+        for token in doc:
+            self.by_pos[token.pos_].append(token)
+            self.by_lower[token.lower_].append(token)
+            self.by_lemma[token.lemma_].append(token)
+
+    def pos(self, *tags):
+        """Tokens with any of the given coarse POS tags."""
+        return self._collect(self.by_pos, tags)
+
+    def words(self, *words):
+        """Tokens whose lowercase text is one of ``words``."""
+        return self._collect(self.by_lower, words)
+
+    def lemmas(self, *lemmas):
+        """Tokens with any of the given lemmas."""
+        return self._collect(self.by_lemma, lemmas)
+
+    def has_word(self, *words):
+        return any(word in self.by_lower for word in words)
+
+    def first(self, *words):
+        """Index of the first token whose lowercase text is one of ``words``, or None."""
+        positions = [self.by_lower[word][0].i for word in words if word in self.by_lower]
+        return min(positions) if positions else None
+
+    def _collect(self, buckets, keys):
+        if len(keys) == 1:
+            return buckets.get(keys[0], [])
+        found = [token for key in keys for token in buckets.get(key, ())]
+        found.sort(key=lambda token: token.i)
+        return found
+
+def token_index(doc):
+    """Per-Doc token index, built once and kept in doc.user_data."""
+    index = doc.user_data.get(TOKEN_INDEX_KEY)
+    if index is None:
+        index = TokenIndex(doc)
+        doc.user_data[TOKEN_INDEX_KEY] = index
+    return index
@@ -23,6 +23,10 @@ def install_dependencies():
     nltk.download('maxent_ne_chunker')
     nltk.download('words')
     
+    print("Building mass-noun lexicon...")
+    from grammar_checker.knowledge import build_mass_noun_lexicon
+    build_mass_noun_lexicon()
+    
     print("All dependencies installed successfully!")
 
 if __name__ == "__main__":
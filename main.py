@@ -1,35 +1,157 @@
+import queue
+import threading
 import tkinter as tk
-import spacy
+from grammar_checker.cache import ResultCache
 from grammar_checker.core import GrammarChecker
 
-nlp = spacy.load("en_core_web_sm")
+# How often the window looks for finished checks.
+POLL_INTERVAL_MS = 50
+# Live mode waits this long after the last keystroke before checking.
+DEBOUNCE_MS = 400
 
-def check_grammar():
-    text = input_box.get("1.0", tk.END).strip()
-    result = checker.check(text)
-    corrected = result.get("corrected_sentence", "")
-    errors = result.get("errors", [])
+class CheckWorker:
+    """Runs checks on a background thread so the window stays responsive.
+
+    Every submitted text gets a generation number. Requests still waiting
+    when a newer one arrives are skipped, and results for anything but the
+    latest generation are ignored by the window. Live requests check the
+    whole text sentence by sentence; the checker's result cache means only
+    sentences that changed since the last pass are parsed again.
+    """
+
+    def __init__(self, checker):
+        self.checker = checker
+        self.generation = 0
+        self.results = queue.Queue()
+        self._requests = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, text, live=False):
+        self.generation += 1
+        self._requests.put((self.generation, text, live))
+        return self.generation
+
+    def invalidate(self):
+        """Mark every outstanding result as stale."""
+        self.generation += 1
+
+    def _run(self):
+        while True:
+            generation, text, live = self._requests.get()
+            # Only the newest waiting request matters
+            while True:
+                try:
+                    generation, text, live = self._requests.get_nowait()
+                except queue.Empty:
+                    break
+            if generation != self.generation:
+                continue
 
+            try:
+                if live:
+                    result = {'sentences': self.checker.check_document(text)}
+                else:
+                    result = self.checker.check(text, include_doc=True)
+            except Exception as e:
+                result = {'failed': str(e)}
+            self.results.put((generation, result))
+
+def show_result(result):
     output_box.delete("1.0", tk.END)
 
+    if 'failed' in result:
+        output_box.insert(tk.END, f"Error while checking: {result['failed']}\n")
+        return
+    if 'sentences' in result:
+        show_live_result(result['sentences'])
+        return
+
+    corrected = result.get("corrected_sentence", "")
+    errors = result.get("errors", [])
+
     if errors:
         output_box.insert(tk.END, f"Corrected: {corrected}\n\nErrors:\n")
         for e in errors:
             output_box.insert(tk.END, f"- {e.get('message')}\n")
-
-        output_box.insert(tk.END, "\n\nPart-of-Speech (POS) Tags:\n")
-        doc = nlp(corrected)
-        for token in doc:
-            output_box.insert(tk.END, f"{token.text} ({token.pos_})  ")
     else:
         output_box.insert(tk.END, "No errors detected!\n")
 
+    # Tags of the sentence as entered, from the parse the check already made
+    doc = result.get("doc")
+    if doc is not None:
         output_box.insert(tk.END, "\n\nPart-of-Speech (POS) Tags:\n")
-        doc = nlp(text)
         for token in doc:
             output_box.insert(tk.END, f"{token.text} ({token.pos_})  ")
 
-checker = GrammarChecker()
+def show_live_result(sentences):
+    """Highlight every error in the input box and list the messages."""
+    input_box.tag_remove("error", "1.0", tk.END)
+    count = 0
+    for sentence in sentences:
+        for e in sentence.get("errors", []):
+            count += 1
+            output_box.insert(tk.END, f"- {e.get('message')}\n")
+            if 'offset' not in e:
+                continue
+            # Insertions have no length; mark the character where the word goes
+            start = f"1.0 + {e['offset']} chars"
+            end = f"1.0 + {e['offset'] + max(e['length'], 1)} chars"
+            input_box.tag_add("error", start, end)
+
+    if count == 0:
+        output_box.insert("1.0", "No errors detected!\n")
+    else:
+        output_box.insert("1.0", f"{count} issue(s) found:\n")
+
+def check_grammar():
+    text = input_box.get("1.0", tk.END).strip()
+    worker.submit(text)
+    output_box.delete("1.0", tk.END)
+    output_box.insert(tk.END, "Checking...\n")
+
+def live_check():
+    global pending_check
+    pending_check = None
+    # Not stripped: error offsets must line up with the widget's characters
+    worker.submit(input_box.get("1.0", "end-1c"), live=True)
+
+def on_modified(event):
+    global pending_check
+    if not input_box.edit_modified():
+        return
+    # Clearing the flag fires <<Modified>> again, caught by the check above
+    input_box.edit_modified(False)
+    if not live_mode.get():
+        return
+
+    # Offsets from any check still running no longer match the text
+    worker.invalidate()
+    input_box.tag_remove("error", "1.0", tk.END)
+    if pending_check is not None:
+        root.after_cancel(pending_check)
+    pending_check = root.after(DEBOUNCE_MS, live_check)
+
+def toggle_live():
+    if live_mode.get():
+        live_check()
+    else:
+        worker.invalidate()
+        input_box.tag_remove("error", "1.0", tk.END)
+
+def poll_results():
+    try:
+        while True:
+            generation, result = worker.results.get_nowait()
+            if generation == worker.generation:
+                show_result(result)
+    except queue.Empty:
+        pass
+    root.after(POLL_INTERVAL_MS, poll_results)
+
+checker = GrammarChecker(cache=ResultCache())
+worker = CheckWorker(checker)
+pending_check = None
 
 root = tk.Tk()
 root.title("Grammar Checker")
@@ -37,10 +159,16 @@ root.title("Grammar Checker")
 tk.Label(root, text="Enter your sentence:").pack()
 input_box = tk.Text(root, height=5, width=50)
 input_box.pack()
+input_box.tag_configure("error", underline=True, foreground="red")
+input_box.bind("<<Modified>>", on_modified)
+
+live_mode = tk.BooleanVar(value=False)
+tk.Checkbutton(root, text="Check as I type", variable=live_mode, command=toggle_live).pack()
 
 tk.Button(root, text="Check Grammar", command=check_grammar).pack(pady=5)
 
 output_box = tk.Text(root, height=15, width=60)
 output_box.pack()
 
+root.after(POLL_INTERVAL_MS, poll_results)
 root.mainloop()
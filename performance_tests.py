@@ -1,177 +1,343 @@
-from grammar_checker.core import GrammarChecker
-import time
-import traceback
+"""
+Benchmark harness for GrammarChecker.
+
+Measures cold-start time, per-sentence latency percentiles, throughput and
+per-detector time over the demo corpus and larger synthetic corpora, and
+writes machine-readable JSON that can be compared against a saved baseline:
+
+    python performance_tests.py --output bench.json
+    python performance_tests.py --baseline bench.json --tolerance 0.15
+
+``--import-only`` just checks that ``import grammar_checker`` stays within
+``--import-budget-ms``, which is cheap enough to run on every commit.
+"""
+
+import argparse
 import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
 from datetime import datetime
 
-class GrammarFixerDemo:
-    def __init__(self):
-        self.checker = GrammarChecker()
-        self.wrong_sentences = [
-            "He go to school every day.",
-            "She like to read books.",
-            "They is playing football.",
-            "I has a new car.",
-            "We was at the park yesterday.",
-            "She is a engineer.",
-            "I saw an university.",
-            "He went to the school yesterday.",
-            "She wants a apple.",
-            "It was an unique experience.",
-            "Their going to the party.",
-            "You're book is on the table.",
-            "Its raining outside.",
-            "There going to be trouble.",
-            "The effect was immediate on his mood.",
-            "Yesterday I go to the store.",
-            "Last week she work very hard.",
-            "Tomorrow I went to the doctor.",
-            "When I was child, I live in Paris.",
-            "He told me he is coming tomorrow.",
-            "She arrived to the station.",
-            "I'm looking my keys.",
-            "He is good in math.",
-            "We discussed about the project.",
-            "She married with a doctor.",
-            "Their going to an university and he have a problem.",
-            "Me and him was late for the meeting.",
-            "Each of the students have their own books.",
-            "Neither John or Mary like the movie.",
-            "The team of researchers have made important discoveries.",
-            "One of my friends are coming over.",
-            "The data shows that the results is significant.",
-            "If I was you, I would have went home earlier.",
-            "The company need to improve it's customer service.",
-            "He don't know nothing about it.",
-            "She sings beautiful.",
-            "I could of gone to the party.",
-            "Between you and I, he is wrong.",
-            "The reason is because I was tired."
-        ]
-    
-    def run_demo(self):
-        print("🚀 GRAMMAR FIXER DEMO")
-        print("=" * 70)
-        print("Fixing grammatically incorrect sentences...")
-        print("=" * 70)
-        
-        total_sentences = len(self.wrong_sentences)
-        fixed_count = 0
-        improvement_count = 0
-        error_count = 0
-        results = []
-        
-        for i, sentence in enumerate(self.wrong_sentences, 1):
-            print(f"\n{i:2d}/{total_sentences} 📝 ORIGINAL: {sentence}")
-            
-            try:
-                result = self.checker.check(sentence)
-                test_result = {
-                    'sentence_id': i,
-                    'original': sentence,
-                    'errors_found': len(result['errors']),
-                    'corrected': result['corrected_sentence'],
-                    'improved': result['corrected_sentence'] != sentence,
-                    'errors': []
-                }
-                
-                if result['errors']:
-                    print(f"    ⚠️  ERRORS FOUND: {len(result['errors'])}")
-                    for error in result['errors']:
-                        error_data = {
-                            'message': error['message'],
-                            'suggestion': error.get('suggestion')
-                        }
-                        test_result['errors'].append(error_data)
-                        print(f"       - {error['message']}")
-                        if error.get('suggestion'):
-                            sugg = error['suggestion']
-                            if sugg['type'] == 'replace':
-                                words = sentence.split()
-                                if sugg['index'] < len(words):
-                                    original_word = words[sugg['index']]
-                                    print(f"         💡 Suggestion: Replace '{original_word}' with '{sugg['word']}'")
-                            elif sugg['type'] == 'remove':
-                                words = sentence.split()
-                                if sugg['index'] < len(words):
-                                    word_to_remove = words[sugg['index']]
-                                    print(f"         💡 Suggestion: Remove '{word_to_remove}'")
-                            elif sugg['type'] == 'insert':
-                                words = sentence.split()
-                                if sugg['index'] - 1 < len(words) and sugg['index'] - 1 >= 0:
-                                    previous_word = words[sugg['index'] - 1]
-                                    print(f"         💡 Suggestion: Insert '{sugg['word']}' after '{previous_word}'")
-                    
-                    corrected = result['corrected_sentence']
-                    if corrected != sentence:
-                        print(f"    ✅ CORRECTED: {corrected}")
-                        fixed_count += 1
-                    else:
-                        print(f"    ❌ NO CORRECTION APPLIED")
-                else:
-                    print(f"    ✅ NO ERRORS DETECTED")
-                
-                if result['corrected_sentence'] != sentence:
-                    improvement_count += 1
-                    
-            except Exception as e:
-                print(f"    🔴 ERROR PROCESSING SENTENCE: {str(e)}")
-                error_count += 1
-                test_result = {
-                    'sentence_id': i,
-                    'original': sentence,
-                    'error': str(e),
-                    'improved': False
-                }
-            
-            results.append(test_result)
-            time.sleep(0.1)
-        
-        print("\n" + "=" * 70)
-        print("📊 DEMO SUMMARY")
-        print("=" * 70)
-        print(f"Total sentences processed: {total_sentences}")
-        print(f"Sentences with errors detected: {fixed_count}")
-        print(f"Sentences improved: {improvement_count}")
-        print(f"Processing errors: {error_count}")
-        
-        if total_sentences - error_count > 0:
-            success_rate = (improvement_count / (total_sentences - error_count)) * 100
-            print(f"Success rate: {success_rate:.1f}%")
-        
-        return results, {
-            'total_sentences': total_sentences,
-            'sentences_with_errors_detected': fixed_count,
-            'sentences_improved': improvement_count,
-            'processing_errors': error_count,
-            'success_rate': success_rate if total_sentences - error_count > 0 else 0
-        }
-    
-    def generate_json_report(self, results, summary):
-        report = {
-            'test_report': {
-                'timestamp': datetime.now().isoformat(),
-                'summary': summary,
-                'detailed_results': results
-            }
+WRONG_SENTENCES = [
+    "He go to school every day.",
+    "She like to read books.",
+    "They is playing football.",
+    "I has a new car.",
+    "We was at the park yesterday.",
+    "She is a engineer.",
+    "I saw an university.",
+    "He went to the school yesterday.",
+    "She wants a apple.",
+    "It was an unique experience.",
+    "Their going to the party.",
+    "You're book is on the table.",
+    "Its raining outside.",
+    "There going to be trouble.",
+    "The effect was immediate on his mood.",
+    "Yesterday I go to the store.",
+    "Last week she work very hard.",
+    "Tomorrow I went to the doctor.",
+    "When I was child, I live in Paris.",
+    "He told me he is coming tomorrow.",
+    "She arrived to the station.",
+    "I'm looking my keys.",
+    "He is good in math.",
+    "We discussed about the project.",
+    "She married with a doctor.",
+    "Their going to an university and he have a problem.",
+    "Me and him was late for the meeting.",
+    "Each of the students have their own books.",
+    "Neither John or Mary like the movie.",
+    "The team of researchers have made important discoveries.",
+    "One of my friends are coming over.",
+    "The data shows that the results is significant.",
+    "If I was you, I would have went home earlier.",
+    "The company need to improve it's customer service.",
+    "He don't know nothing about it.",
+    "She sings beautiful.",
+    "I could of gone to the party.",
+    "Between you and I, he is wrong.",
+    "The reason is because I was tired."
+]
+
+# Building blocks for synthetic sentences of varying length and error mix.
+SUBJECTS = ["he", "she", "they", "I", "we", "the team", "my friend", "the students", "John", "everyone"]
+VERBS = ["go", "goes", "went", "like", "likes", "work", "works", "is", "are", "was", "were", "have", "has"]
+OBJECTS = ["to school", "a apple", "an university", "the Paris", "good in math", "about the project",
+           "a engineer", "to the store", "football", "a new car", "on Monday", "in night"]
+MARKERS = ["", "", "yesterday", "tomorrow", "every day", "last week", "now", "next year"]
+CLAUSES = ["", "", "and he have a problem", "because I was tired", "when I was child", "if I was you"]
+
+COLD_START_SCRIPT = """
+import json, time
+t0 = time.perf_counter()
+from grammar_checker.core import GrammarChecker
+t1 = time.perf_counter()
+checker = GrammarChecker()
+t2 = time.perf_counter()
+checker.check("He go to school every day.")
+t3 = time.perf_counter()
+print(json.dumps({"import_s": t1 - t0, "init_s": t2 - t1, "first_check_s": t3 - t2, "total_s": t3 - t0}))
+"""
+
+IMPORT_TIME_SCRIPT = "from grammar_checker import GrammarChecker"
+
+# Importing the package and GrammarChecker must not pull in spaCy,
+# lemminflect or NLTK; those load on the first check.
+DEFAULT_IMPORT_BUDGET_MS = 100.0
+
+def synthetic_corpus(size, seed=0):
+    """Reproducible corpus of ``size`` generated sentences."""
+    rng = random.Random(seed)
+    sentences = []
+    for _ in range(size):
+        parts = [rng.choice(SUBJECTS), rng.choice(VERBS), rng.choice(OBJECTS),
+                 rng.choice(MARKERS), rng.choice(CLAUSES)]
+        sentence = " ".join(part for part in parts if part)
+        sentences.append(sentence[0].upper() + sentence[1:] + ".")
+    return sentences
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+def summarize(durations):
+    """Latency summary in milliseconds."""
+    return {
+        "count": len(durations),
+        "mean_ms": statistics.fmean(durations) * 1000 if durations else 0.0,
+        "p50_ms": percentile(durations, 50) * 1000,
+        "p95_ms": percentile(durations, 95) * 1000,
+        "p99_ms": percentile(durations, 99) * 1000,
+        "max_ms": max(durations) * 1000 if durations else 0.0,
+    }
+
+def measure_cold_start():
+    """Import, construct and run one check in a fresh interpreter."""
+    output = subprocess.run([sys.executable, "-c", COLD_START_SCRIPT],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def measure_import_time():
+    """Import time of ``from grammar_checker import GrammarChecker`` from ``python -X importtime``.
+
+    Sums the cumulative time of every top-level grammar_checker module, since
+    the lazily imported submodules show up as separate top-level entries.
+    """
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", IMPORT_TIME_SCRIPT],
+                            capture_output=True, text=True, check=True).stderr
+    total_us = None
+    for line in stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) != 3:
+            continue
+        name = fields[2].rstrip()
+        # Nested imports are indented under their parent.
+        if name.strip().startswith("grammar_checker") and name == " " + name.strip():
+            total_us = (total_us or 0) + int(fields[1])
+    return total_us / 1e6 if total_us is not None else None
+
+def check_import_budget(import_time_s, budget_ms):
+    """Regression entry if the package import exceeded ``budget_ms``, else None."""
+    if import_time_s is None or import_time_s * 1000 <= budget_ms:
+        return None
+    return {"metric": "import_time_s", "baseline": budget_ms / 1000, "current": import_time_s,
+            "change_pct": round((import_time_s * 1000 / budget_ms - 1) * 100, 1)}
+
+def measure_latency(checker, sentences, repeat):
+    """Time checker.check per sentence over ``repeat`` passes."""
+    durations = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for sentence in sentences:
+            t0 = time.perf_counter()
+            checker.check(sentence)
+            durations.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+    result = summarize(durations)
+    result["sentences_per_sec"] = len(durations) / elapsed if elapsed else 0.0
+    return result
+
+def measure_batch(checker, sentences, repeat, batch_size):
+    """Throughput of check_many over the corpus."""
+    start = time.perf_counter()
+    count = 0
+    for _ in range(repeat):
+        for _ in checker.check_many(sentences, batch_size=batch_size):
+            count += 1
+    elapsed = time.perf_counter() - start
+    return {"batch_size": batch_size, "sentences_per_sec": count / elapsed if elapsed else 0.0}
+
+def measure_stages(checker, sentences):
+    """Time spent parsing, building the shared analysis and in each detector,
+    summed over the corpus."""
+    stages = {"parse": [], "analysis": []}
+    stages.update({name: [] for name, _ in checker.detectors})
+
+    for sentence in sentences:
+        t0 = time.perf_counter()
+        context = checker.context_analyzer.analyze(sentence)
+        stages["parse"].append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        context.prepare()
+        stages["analysis"].append(time.perf_counter() - t0)
+
+        for name, detector in checker.detectors:
+            t0 = time.perf_counter()
+            detector.detect(context)
+            stages[name].append(time.perf_counter() - t0)
+
+    return {name: dict(summarize(durations), total_ms=sum(durations) * 1000)
+            for name, durations in stages.items()}
+
+def run_benchmarks(args):
+    from grammar_checker.core import GrammarChecker
+
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "corpora": {},
+    }
+
+    if not args.skip_cold_start:
+        results["cold_start"] = measure_cold_start()
+        results["import_time_s"] = measure_import_time()
+
+    checker = GrammarChecker()
+    corpora = {}
+    if args.corpus in ("demo", "all"):
+        corpora["demo"] = WRONG_SENTENCES
+    if args.corpus in ("synthetic", "all"):
+        corpora[f"synthetic_{args.synthetic_size}"] = synthetic_corpus(args.synthetic_size, args.seed)
+
+    for name, sentences in corpora.items():
+        for sentence in sentences[:args.warmup]:
+            checker.check(sentence)
+        results["corpora"][name] = {
+            "sentences": len(sentences),
+            "latency": measure_latency(checker, sentences, args.repeat),
+            "batch": measure_batch(checker, sentences, args.repeat, args.batch_size),
+            "stages": measure_stages(checker, sentences),
         }
-        
-        filename = f"grammar_test_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
-        
-        print(f"\n💾 JSON report saved to: {filename}")
-        return filename
-
-def main():
-    demo = GrammarFixerDemo()
-    results, summary = demo.run_demo()
-    demo.generate_json_report(results, summary)
-    
-    print("\n" + "=" * 70)
-    print("🎯 DEMO COMPLETED")
-    print("=" * 70)
+
+    return results
+
+def compare(current, baseline, tolerance):
+    """List metrics that regressed by more than ``tolerance`` (a fraction)."""
+    regressions = []
+
+    def check(label, now, before, higher_is_worse=True):
+        if not before or now is None:
+            return
+        change = (now - before) / before
+        if (change if higher_is_worse else -change) > tolerance:
+            regressions.append({"metric": label, "baseline": before, "current": now,
+                                "change_pct": round(change * 100, 1)})
+
+    if "cold_start" in current and "cold_start" in baseline:
+        check("cold_start.total_s", current["cold_start"]["total_s"], baseline["cold_start"]["total_s"])
+    if current.get("import_time_s") and baseline.get("import_time_s"):
+        check("import_time_s", current["import_time_s"], baseline["import_time_s"])
+
+    for name, corpus in current["corpora"].items():
+        before = baseline.get("corpora", {}).get(name)
+        if not before:
+            continue
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            check(f"{name}.latency.{key}", corpus["latency"][key], before["latency"][key])
+        check(f"{name}.latency.sentences_per_sec", corpus["latency"]["sentences_per_sec"],
+              before["latency"]["sentences_per_sec"], higher_is_worse=False)
+        check(f"{name}.batch.sentences_per_sec", corpus["batch"]["sentences_per_sec"],
+              before["batch"]["sentences_per_sec"], higher_is_worse=False)
+        for stage, stats in corpus["stages"].items():
+            if stage in before["stages"]:
+                check(f"{name}.stages.{stage}.total_ms", stats["total_ms"], before["stages"][stage]["total_ms"])
+
+    return regressions
+
+def print_report(results):
+    if "cold_start" in results:
+        cold = results["cold_start"]
+        print(f"Cold start: {cold['total_s']:.3f}s (import {cold['import_s']:.3f}s, "
+              f"init {cold['init_s']:.3f}s, first check {cold['first_check_s']:.3f}s)")
+    if results.get("import_time_s") is not None:
+        print(f"{IMPORT_TIME_SCRIPT}: {results['import_time_s'] * 1000:.1f} ms")
+
+    for name, corpus in results["corpora"].items():
+        latency = corpus["latency"]
+        print(f"\n[{name}] {corpus['sentences']} sentences x {results['repeat']}")
+        print(f"  latency  p50 {latency['p50_ms']:.2f} ms  p95 {latency['p95_ms']:.2f} ms  "
+              f"p99 {latency['p99_ms']:.2f} ms")
+        print(f"  throughput  check {latency['sentences_per_sec']:.1f}/s  "
+              f"check_many {corpus['batch']['sentences_per_sec']:.1f}/s")
+        for stage, stats in corpus["stages"].items():
+            print(f"  {stage:<14} total {stats['total_ms']:8.1f} ms  p95 {stats['p95_ms']:.3f} ms")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark GrammarChecker.")
+    parser.add_argument("--corpus", choices=["demo", "synthetic", "all"], default="all")
+    parser.add_argument("--synthetic-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--skip-cold-start", action="store_true")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against a previous JSON result")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="allowed fractional regression before failing (default 0.10)")
+    parser.add_argument("--import-budget-ms", type=float, default=DEFAULT_IMPORT_BUDGET_MS,
+                        help=f"fail if 'import grammar_checker' takes longer (default {DEFAULT_IMPORT_BUDGET_MS:g})")
+    parser.add_argument("--import-only", action="store_true",
+                        help="only measure the package import time against the budget")
+    args = parser.parse_args(argv)
+
+    if args.import_only:
+        # Best of a few runs, so a cold disk cache does not fail the check.
+        import_time_s = min(measure_import_time() for _ in range(3))
+        print(f"{IMPORT_TIME_SCRIPT}: {import_time_s * 1000:.1f} ms (budget {args.import_budget_ms:g} ms)")
+        return 1 if check_import_budget(import_time_s, args.import_budget_ms) else 0
+
+    results = run_benchmarks(args)
+    print_report(results)
+
+    exit_code = 0
+    over_budget = check_import_budget(results.get("import_time_s"), args.import_budget_ms)
+    if over_budget:
+        exit_code = 1
+        print(f"\n{IMPORT_TIME_SCRIPT} took {over_budget['current'] * 1000:.1f} ms, "
+              f"over the {args.import_budget_ms:g} ms budget")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        results["regressions"] = compare(results, baseline, args.tolerance)
+        if results["regressions"]:
+            exit_code = 1
+            print(f"\n{len(results['regressions'])} regression(s) beyond {args.tolerance:.0%}:")
+            for item in results["regressions"]:
+                print(f"  {item['metric']}: {item['baseline']:.4g} -> {item['current']:.4g} "
+                      f"({item['change_pct']:+.1f}%)")
+        else:
+            print("\nNo regressions against baseline.")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    return exit_code
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())